@@ -10,6 +10,7 @@ Implements:
 2. Control points of a bezier curve.
 3. Curve fit and approximate smooth shapes in the form of cubic splines with single or multiple segments.
 4. Control tensor of the entire cubic spline which contains control points for the entire curve.
+5. Vectorized evaluation of many cubic beziers (segments, foils) in a single matrix product.
 
 Contains 2 sub-modules:
 
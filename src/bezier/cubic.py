@@ -5,6 +5,7 @@ bezier.cubic
 Interpolating a set of points using a cubic bezier curve
 """
 
+from functools import lru_cache
 import numpy as np
 from database.basis_matrices import (
     BEZIER_MATRIX,
@@ -26,53 +27,57 @@ def __create_point_matrix(*points: list[np.ndarray]) -> np.ndarray:
     return np.vstack((points))
 
 
-def __curve_point(
-    t: float, matrix: np.ndarray, control_points: np.ndarray
-) -> np.ndarray:
+def cubic_basis(t: np.ndarray) -> np.ndarray:
     """
-    Outputs a single point of the curve corresponding to the t parameter.
+    Evaluates the cubic bezier basis at the given t parameters.
+    Each row is the power vector [1, t, t^2, t^3] multiplied with the characteristic matrix,
+    so that `cubic_basis(t) @ control_points` gives the curve points at those t values.
 
         PARAMETERS:
 
-            `t` -> t parameter of the curve ranging from 0 to 1. Type(float)
+            `t` -> t parameters of the curve ranging from 0 to 1. Type(np.ndarray)
+
+        RETURNS:
+
+            `t_matrix @ BEZIER_MATRIX` -> (len(t) x 4) basis matrix. Type(np.ndarray)
+    """
+    t = np.asarray(t, dtype=float)
+    t_matrix = t[:, np.newaxis] ** np.arange(len(BEZIER_MATRIX))
+    return t_matrix @ BEZIER_MATRIX
 
-            `matrix` -> characteristic symmetric matrix of the curve. Type(np.ndarray)
 
-            `control_points` -> array of control points of the curve in a single array. Type(np.ndarray)
+@lru_cache(maxsize=64)
+def __uniform_basis(n_points: int) -> np.ndarray:
+    """
+    Cached cubic bezier basis for `n_points` uniformly spaced t parameters.
+    The returned array is read-only as it is shared between all the callers.
+
+        PARAMETERS:
+
+            `n_points` -> number of curve points. Type(int)
 
         RETURNS:
 
-            `point` -> Point on the curve that corresponds to the input t value. Type(np.ndarray)
+            `basis` -> (n_points x 4) basis matrix. Type(np.ndarray)
     """
-    if len(matrix) != len(matrix[0]):  # characteristic matrix is not valid
-        raise TypeError("Only square matrices are allowed as the matrix inputs")
-    if len(matrix) != len(
-        control_points
-    ):  # Cannot multiply characteristic and control point matrix
-        raise TypeError(
-            "The number of columns in matrix is not equal to the number of control points"
-        )
+    basis = cubic_basis(np.linspace(0, 1, n_points))
+    basis.setflags(write=False)
+    return basis
+
 
-    control_product = np.zeros_like(
-        control_points
-    )  # this variable will hold the product of characteristic matrix and control matrix
+def uniform_basis(n_points: int) -> np.ndarray:
+    """
+    Returns the cached cubic bezier basis for `n_points` uniformly spaced t parameters (read-only).
 
-    for i in range(len(matrix)):
-        for j in range(len(matrix[0])):
-            control_product[i] += matrix[i, j] * control_points[j]
+        PARAMETERS:
 
-    t_vector = np.zeros(len(matrix))
-    for i in range(len(matrix)):
-        t_vector[i] = t**i
+            `n_points` -> number of curve points. Type(int)
 
-    x_sum = 0
-    y_sum = 0
-    for i in range(len(t_vector)):
-        x_sum += t_vector[i] * control_product[i, 0]
-        y_sum += t_vector[i] * control_product[i, 1]
+        RETURNS:
 
-    point = np.array([x_sum, y_sum])
-    return point
+            `basis` -> (n_points x 4) basis matrix. Type(np.ndarray)
+    """
+    return __uniform_basis(int(n_points))
 
 
 def cubic_bezier_curve(*control_points: list[np.ndarray], n_points: int) -> np.ndarray:
@@ -87,10 +92,32 @@ def cubic_bezier_curve(*control_points: list[np.ndarray], n_points: int) -> np.n
 
         RETURNS:
 
-            `np.array([__curve_point(ti, BEZIER_MATRIX, control_points) for ti in t])` -> Array of coordinates for the cubic bezier curve. Type(np.ndarray)
+            `uniform_basis(n_points) @ control_points` -> Array of coordinates for the cubic bezier curve. Type(np.ndarray)
     """
     control_points = __create_point_matrix(control_points)
     if len(control_points) != 4:
         raise ValueError("Cubic bezier curve requires 4 control points as input")
-    t = np.linspace(0, 1, n_points)
-    return np.array([__curve_point(ti, BEZIER_MATRIX, control_points) for ti in t])
+    return uniform_basis(n_points) @ control_points
+
+
+def cubic_bezier_curves(control_points: np.ndarray, n_points: int) -> np.ndarray:
+    """
+    Creates many bezier curves at once. Any number of leading dimensions is allowed,
+    e.g. (segments x 4 x 2) or (foils x segments x 4 x 2), and all of them are evaluated in a single matmul.
+
+        PARAMETERS:
+
+            `control_points` -> Stack of control point sets with shape (..., 4, 2). Type(np.ndarray)
+
+            `n_points` -> number of curve points to output for each curve. Type(int)
+
+        RETURNS:
+
+            `uniform_basis(n_points) @ control_points` -> Array of curve coordinates with shape (..., n_points, 2). Type(np.ndarray)
+    """
+    control_points = np.asarray(control_points, dtype=float)
+    if control_points.ndim < 2 or control_points.shape[-2] != 4:
+        raise ValueError(
+            "Cubic bezier curves require control points of shape (..., 4, 2) as input"
+        )
+    return uniform_basis(n_points) @ control_points
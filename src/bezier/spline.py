@@ -5,15 +5,80 @@ bezier.spline
 Interpolating shapes using cubic bezier splines
 """
 
+import warnings
+from concurrent.futures import Executor, ThreadPoolExecutor
 import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve, MatrixRankWarning
 from scipy.optimize import minimize
-from bezier.cubic import cubic_bezier_curve
+from bezier.cubic import cubic_basis, uniform_basis, cubic_bezier_curves
+
+PARAMETRIZATIONS = ("uniform", "chord_length", "centripetal")
+"""
+Supported ways of assigning t parameters to the curve data of a segment.
+"""
+
+
+def __parametrize(curve_data: np.ndarray, parametrization: str) -> np.ndarray:
+    """
+    Assigns a t parameter between 0 and 1 to every point of the curve data.
+
+    PARAMETERS:
+
+        `curve_data` -> Original curve data. Type(np.ndarray)
+
+        `parametrization` -> "uniform" (equally spaced t), "chord_length" (t proportional to the distance
+        along the data) or "centripetal" (t proportional to the square root of the distance). Type(str)
+
+    RETURNS:
+
+        `t` -> t parameters of the curve data. Type(np.ndarray)
+
+    """
+    if parametrization not in PARAMETRIZATIONS:
+        raise ValueError(
+            f"Unknown parametrization '{parametrization}'. Choose from {PARAMETRIZATIONS}"
+        )
+    num_points = len(curve_data)
+    if parametrization == "uniform":
+        return np.linspace(0, 1, num_points)
+
+    distances = np.linalg.norm(np.diff(curve_data, axis=0), axis=1)
+    if parametrization == "centripetal":
+        distances = np.sqrt(distances)
+    t = np.concatenate(([0.0], np.cumsum(distances)))
+    if t[-1] == 0:  # degenerate segment, all points coincide
+        return np.linspace(0, 1, num_points)
+    return t / t[-1]
 
 
-def __residuals(flat_control_points: np.ndarray, curve_data: np.ndarray) -> float:
+def __basis(curve_data: np.ndarray, parametrization: str) -> np.ndarray:
     """
-    Calculates the normal distance between the original curve points and
-    the curve points generated by bezier approximation.
+    Cubic bezier basis matrix evaluated at the t parameters of the curve data.
+
+    PARAMETERS:
+
+        `curve_data` -> Original curve data. Type(np.ndarray)
+
+        `parametrization` -> Choice of t parameters, see `PARAMETRIZATIONS`. Type(str)
+
+    RETURNS:
+
+        `basis` -> (number of points x 4) basis matrix. Type(np.ndarray)
+
+    """
+    if parametrization == "uniform":
+        return uniform_basis(len(curve_data))  # cached
+    return cubic_basis(__parametrize(curve_data, parametrization))
+
+
+def __squared_residuals(
+    flat_control_points: np.ndarray, curve_data: np.ndarray, basis: np.ndarray
+) -> tuple[float, np.ndarray]:
+    """
+    Calculates the sum of squared distances between the original curve points and
+    the curve points generated by bezier approximation, along with its exact gradient.
+    The objective is smooth, so gradient based solvers can use the jacobian directly.
 
     PARAMETERS:
 
@@ -22,17 +87,28 @@ def __residuals(flat_control_points: np.ndarray, curve_data: np.ndarray) -> floa
 
         `curve_data` -> Original curve data. Type(np.ndarray)
 
+        `basis` -> Cubic bezier basis evaluated at the t parameters of the curve data. Type(np.ndarray)
+
     RETURNS:
-        `np.sum(np.linalg.norm(bezier_points - curve_data))` -> Normal distance between bezier and actual curve. Type(float)
+
+        `objective, gradient` -> Squared distance and its gradient with respect to the 8 control coordinates. Type(tuple[float, np.ndarray])
 
     """
-    num_points = len(curve_data)
-    control_points = np.array(flat_control_points.reshape(4, 2))
-    bezier_points = cubic_bezier_curve(*control_points, n_points=num_points)
-    return np.sum(np.linalg.norm(bezier_points - curve_data))
+    difference = basis @ flat_control_points.reshape(4, 2) - curve_data
+    objective = np.sum(difference**2)
+    gradient = 2 * basis.T @ difference  # d(objective)/d(control points), (4 x 2)
+    return objective, gradient.ravel()
+
 
+GRADIENT_FREE_METHODS = ("nelder-mead", "powell", "cobyla", "cobyqa")
+"""
+scipy minimize methods which do not use the jacobian of the objective.
+"""
 
-def __fit_bezier(curve_data: np.ndarray, method: str) -> np.ndarray:
+
+def __fit_bezier(
+    curve_data: np.ndarray, method: str, parametrization: str = "uniform"
+) -> np.ndarray:
     """
     Curve fits the orignal curve data into a bezier curve.
     The returned control points can be used to generate bezier curve
@@ -41,7 +117,10 @@ def __fit_bezier(curve_data: np.ndarray, method: str) -> np.ndarray:
 
         `curve_data` -> Original curve data. Type(np.ndarray)
 
-        `method` -> Optimization method used to curve_fit the data. Type(str)
+        `method` -> Optimization method used to curve_fit the data. "lstsq" solves the
+        linear least squares problem directly, any other value is passed on to scipy's minimize. Type(str)
+
+        `parametrization` -> Choice of t parameters for the curve data, see `PARAMETRIZATIONS`. Type(str)
 
     RETURNS:
 
@@ -50,16 +129,29 @@ def __fit_bezier(curve_data: np.ndarray, method: str) -> np.ndarray:
         Reshapes makes them usable to generate bezier curves. Type(np.ndarray)
 
     """
+    basis = __basis(curve_data, parametrization)
+
+    if method == "lstsq":
+        # For fixed t parameters the curve is linear in the control points,
+        # so the best fit is the solution of (basis @ control_points = curve_data)
+        return np.linalg.lstsq(basis, curve_data, rcond=None)[0]
+
     P0 = curve_data[0]
     P3 = curve_data[-1]
     P1 = curve_data[len(curve_data) // 3]
     P2 = curve_data[2 * len(curve_data) // 3]
 
+    if method.lower() in GRADIENT_FREE_METHODS:
+        objective, jac = lambda x, *args: __squared_residuals(x, *args)[0], None
+    else:
+        objective, jac = __squared_residuals, True  # objective returns the gradient too
+
     result = minimize(
-        __residuals,
+        objective,
         np.array([P0, P1, P2, P3]).flatten(),
-        args=(curve_data,),
+        args=(curve_data, basis),
         method=method,
+        jac=jac,
         tol=1e-15,
     ).x
 
@@ -94,15 +186,16 @@ def __enforce_c0_continuity(control_points: np.ndarray) -> np.ndarray:
 
     PARAMETERS:
 
-        `control_points` -> Control points of all the segments of the curve. Type(np.ndarray)
+        `control_points` -> Control points of all the segments of the curve, (4 x 2 x segments)
+        or a stack of them with any number of leading dimensions. Type(np.ndarray)
 
     RETURNS:
 
         `control_points` -> C0 continuous control points where all segments are well connected. Type(np.ndarray)
 
     """
-    for i in range(control_points.shape[2] - 1):  # Iterate over segments
-        control_points[0, :, i + 1] = control_points[3, :, i]  # Match end to start
+    # Match end to start, for all segment joints at once
+    control_points[..., 0, :, 1:] = control_points[..., 3, :, :-1]
     return control_points
 
 
@@ -112,18 +205,18 @@ def __enforce_c1_continuity(control_points: np.ndarray) -> np.ndarray:
 
     PARAMETERS:
 
-        `control_points` -> Control points of all the segments of the curve. Type(np.ndarray)
+        `control_points` -> Control points of all the segments of the curve, (4 x 2 x segments)
+        or a stack of them with any number of leading dimensions. Type(np.ndarray)
 
     RETURNS:
 
         `control_points` -> C1 continuous control points where all segment tangents are aligned. Type(np.ndarray)
 
     """
-    for i in range(control_points.shape[2] - 1):  # Iterate over segments
-        # Compute the tangent at the end of the current segment
-        tangent = control_points[3, :, i] - control_points[2, :, i]
-        # Adjust the tangent of the next segment
-        control_points[1, :, i + 1] = control_points[0, :, i + 1] + tangent
+    # Compute the tangent at the end of every segment but the last
+    tangent = control_points[..., 3, :, :-1] - control_points[..., 2, :, :-1]
+    # Adjust the tangent of the next segment
+    control_points[..., 1, :, 1:] = control_points[..., 0, :, 1:] + tangent
     return control_points
 
 
@@ -133,26 +226,21 @@ def __enforce_c2_continuity(control_points: np.ndarray) -> np.ndarray:
 
     PARAMETERS:
 
-        `control_points` -> Control points of all the segments of the curve. Type(np.ndarray)
+        `control_points` -> Control points of all the segments of the curve, (4 x 2 x segments)
+        or a stack of them with any number of leading dimensions. Type(np.ndarray)
 
     RETURNS:
         `control_points` -> Modified control points with enforced C2 continuity. Type(np.ndarray)
     """
-    num_segments = control_points.shape[2]
-
-    for i in range(num_segments - 1):  # Iterate over each segment boundary
-        # Compute the curvature condition
-        p_prev = control_points[2, :, i]  # Third control point of the current segment
-        p_next = control_points[
-            0, :, i + 1
-        ]  # First control point of the next segment (C0 already enforced)
-        p_end = control_points[3, :, i]  # End point of the current segment
-        """p_start = control_points[
-            1, :, i + 1
-        ]"""  # Second control point of the next segment
+    # Curvature condition at every segment boundary
+    p_prev = control_points[..., 2, :, :-1]  # Third control point of the current segment
+    p_next = control_points[
+        ..., 0, :, 1:
+    ]  # First control point of the next segment (C0 already enforced)
+    p_end = control_points[..., 3, :, :-1]  # End point of the current segment
 
-        # Adjust the second control point of the next segment for C2 continuity
-        control_points[1, :, i + 1] = 2 * p_next - p_prev - (p_end - p_next)
+    # Adjust the second control point of the next segment for C2 continuity
+    control_points[..., 1, :, 1:] = 2 * p_next - p_prev - (p_end - p_next)
 
     return control_points
 
@@ -175,8 +263,229 @@ def __enforce_continuity(control_points: np.ndarray) -> np.ndarray:
     return control_points
 
 
+def enforce_continuity(control_points: np.ndarray) -> np.ndarray:
+    """
+    Enforces C0, C1 and C2 continuity in place on a control tensor (4 x 2 x segments)
+    or on a stack of control tensors, e.g. (foils x 4 x 2 x segments), in one vectorized pass.
+
+    PARAMETERS:
+
+        `control_points` -> Control points of all the segments of one or many curves. Type(np.ndarray)
+
+    RETURNS:
+        `control_points` -> C0, C1 and C2 continuous control points. Type(np.ndarray)
+
+    """
+    return __enforce_continuity(control_points)
+
+
+def __segment_bounds(num_points: int, num_segments: int) -> np.ndarray:
+    """
+    Indices of the segment end points when the curve data is divided into segments of (almost) equal size.
+    Neighbouring segments share their end point and every data point belongs to a segment.
+
+    PARAMETERS:
+
+        `num_points` -> Number of points in the curve data. Type(int)
+
+        `num_segments` -> Number of segments. Type(int)
+
+    RETURNS:
+
+        `bounds` -> (num_segments + 1) indices, segment i spans curve_data[bounds[i] : bounds[i + 1] + 1]. Type(np.ndarray)
+
+    """
+    if num_points - 1 < num_segments:
+        raise ValueError(
+            f"Cannot divide {num_points} points into {num_segments} segments"
+        )
+    return np.round(np.linspace(0, num_points - 1, num_segments + 1)).astype(int)
+
+
+def __continuity_constraints(num_segments: int, continuity: int) -> sparse.csr_matrix:
+    """
+    Linear equality constraints (constraints @ p = 0) between the control points of neighbouring segments.
+    p holds the control points of all segments in order, p[4 * i + k] being the k-th control point of segment i.
+
+    PARAMETERS:
+
+        `num_segments` -> Number of segments. Type(int)
+
+        `continuity` -> Highest order of continuity enforced at the segment joints (0, 1 or 2). Type(int)
+
+    RETURNS:
+
+        `constraints` -> (constraints x 4 * num_segments) sparse matrix. Type(sparse.csr_matrix)
+
+    """
+    # Coefficients of (P0, P1, P2, P3) of segment i and of segment i + 1 for each order of continuity
+    stencils = [
+        ([0, 0, 0, 1], [-1, 0, 0, 0]),  # C0 -> end point meets the next start point
+        ([0, 0, -1, 1], [1, -1, 0, 0]),  # C1 -> end tangent equals the next start tangent
+        ([0, 1, -2, 1], [-1, 2, -1, 0]),  # C2 -> end curvature equals the next start curvature
+    ][: continuity + 1]
+
+    rows, cols, values = [], [], []
+    row = 0
+    for i in range(num_segments - 1):
+        for current, following in stencils:
+            for k in range(4):
+                for segment, coefficient in ((i, current[k]), (i + 1, following[k])):
+                    if coefficient:
+                        rows.append(row)
+                        cols.append(4 * segment + k)
+                        values.append(coefficient)
+            row += 1
+    return sparse.csr_matrix((values, (rows, cols)), shape=(row, 4 * num_segments))
+
+
+def fit_global_control_tensor(
+    curve_data: np.ndarray,
+    num_segments: int,
+    continuity: int = 2,
+    parametrization: str = "uniform",
+) -> tuple[np.ndarray, float]:
+    """
+    Fits all segments of the cubic spline together as one equality constrained linear least squares problem.
+    Continuity between the segments and the end points of the curve are part of the solve (KKT system),
+    so no control points need to be overwritten afterwards.
+
+    PARAMETERS:
+
+        `curve_data` -> Coordinates of the curve to be modelled using bezier spline. Type(np.ndarray)
+
+        `num_segments` -> Number of segments in the cubic spline. Type(int)
+
+        `continuity` -> Highest order of continuity at the segment joints, 0 (C0), 1 (C1) or 2 (C2). Type(int)
+
+        `parametrization` -> Choice of t parameters for the data of each segment:
+        "uniform", "chord_length" or "centripetal". Type(str)
+
+    RETURNS:
+
+        `control_tensor, residual` -> (4 by 2 by number of segments) control tensor of the spline and the
+        normal distance between the spline and the curve data. Type(tuple[np.ndarray, float])
+
+    """
+    if continuity not in (0, 1, 2):
+        raise ValueError("Continuity must be 0, 1 or 2")
+    curve_data = np.asarray(curve_data, dtype=float)
+    bounds = __segment_bounds(len(curve_data), num_segments)
+    segments = [curve_data[bounds[i] : bounds[i + 1] + 1] for i in range(num_segments)]
+
+    # Block diagonal design matrix, every segment only sees its own 4 control points
+    design = sparse.block_diag(
+        [__basis(segment, parametrization) for segment in segments], format="csr"
+    )
+    data = np.vstack(segments)
+
+    # Continuity at the joints and the spline passing through the end points of the curve
+    pins = sparse.csr_matrix(
+        ([1.0, 1.0], ([0, 1], [0, 4 * num_segments - 1])),
+        shape=(2, 4 * num_segments),
+    )
+    constraints = sparse.vstack(
+        [__continuity_constraints(num_segments, continuity), pins], format="csr"
+    )
+    targets = np.zeros((constraints.shape[0], 2))
+    targets[-2] = curve_data[0]
+    targets[-1] = curve_data[-1]
+
+    kkt = sparse.bmat(
+        [[design.T @ design, constraints.T], [constraints, None]], format="csc"
+    )
+    rhs = np.vstack((design.T @ data, targets))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", MatrixRankWarning)
+        solution = np.asarray(spsolve(kkt, rhs)).reshape(len(rhs), 2)
+    if not np.all(np.isfinite(solution)):  # rank deficient (too few points per segment)
+        solution = np.linalg.lstsq(kkt.toarray(), rhs, rcond=None)[0]
+
+    control_points = solution[: 4 * num_segments]
+    residual = float(np.linalg.norm(design @ control_points - data))
+
+    # (segments x 4 x 2) -> (4 x 2 x segments)
+    control_tensor = np.moveaxis(control_points.reshape(num_segments, 4, 2), 0, -1)
+    return np.ascontiguousarray(control_tensor), residual
+
+
+def get_control_tensors(
+    curves: list[np.ndarray],
+    num_segments: int,
+    method: str,
+    parametrization: str = "uniform",
+    workers: int = 1,
+    executor: Executor | None = None,
+) -> list[np.ndarray]:
+    """
+    Calculates the control tensors of several curves (e.g. upper and lower surface of an aerofoil).
+    All the independent segment fits of all the curves can be run concurrently.
+
+    PARAMETERS:
+
+        `curves` -> Coordinates of the curves to be modelled using bezier splines. Type(list[np.ndarray])
+
+        `num_segments` -> Number of segments in each cubic spline. Type(int)
+
+        `method` -> Optimization method used to curve_fit the data, see `get_control_tensor`. Type(str)
+
+        `parametrization` -> Choice of t parameters for the data of each segment:
+        "uniform", "chord_length" or "centripetal". Type(str)
+
+        `workers` -> Number of threads to fit with when no executor is given. 1 fits serially. Type(int)
+
+        `executor` -> Thread or process pool to submit the fits to, it is not shut down here. Type(Executor)
+
+    RETURN:
+
+        `control_tensors` -> (4 by 2 by number of segments) control tensor of every curve, in order. Type(list[np.ndarray])
+    """
+    if method == "global":
+        # one linear solve per curve, the segments are coupled
+        tasks = [
+            (fit_global_control_tensor, (curve_data, num_segments, 2, parametrization))
+            for curve_data in curves
+        ]
+    else:
+        tasks = [
+            (__fit_bezier, (segment, method, parametrization))
+            for curve_data in curves
+            for segment in __split_data(curve_data, num_segments)[:num_segments]
+        ]
+
+    if executor is None and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = [pool.submit(task, *args) for task, args in tasks]
+            results = [future.result() for future in results]
+    elif executor is not None:
+        results = [executor.submit(task, *args) for task, args in tasks]
+        results = [future.result() for future in results]
+    else:
+        results = [task(*args) for task, args in tasks]
+
+    if method == "global":
+        return [control_tensor for control_tensor, _ in results]
+
+    control_tensors = []
+    for i, curve_data in enumerate(curves):
+        control_tensor = np.zeros(shape=(4, 2, num_segments))
+        for j in range(num_segments):
+            control_tensor[:, :, j] = results[i * num_segments + j]
+
+        control_tensor[0, :, 0] = curve_data[0]
+        control_tensor[-1, :, -1] = curve_data[-1]
+
+        control_tensors.append(__enforce_continuity(control_tensor))
+    return control_tensors
+
+
 def get_control_tensor(
-    curve_data: np.ndarray, num_segments: int, method: str
+    curve_data: np.ndarray,
+    num_segments: int,
+    method: str,
+    parametrization: str = "uniform",
+    workers: int = 1,
+    executor: Executor | None = None,
 ) -> np.ndarray:
     """
     Calculates a (4 x 2 x number of segments) array which contains control points for all segments of the cubic bezier spline
@@ -187,24 +496,25 @@ def get_control_tensor(
 
         `num_segments` -> Number of segments in the cubic spline. Type(int)
 
-        `method` -> Optimization method used to curve_fit the data. Type(str)
+        `method` -> Optimization method used to curve_fit the data.
+        "lstsq" solves the linear least squares problem of each segment directly.
+        "global" fits all segments together with C0, C1 and C2 continuity, see `fit_global_control_tensor`. Type(str)
+
+        `parametrization` -> Choice of t parameters for the data of each segment:
+        "uniform", "chord_length" or "centripetal". Type(str)
+
+        `workers` -> Number of threads to fit the segments with when no executor is given. Type(int)
+
+        `executor` -> Thread or process pool to submit the segment fits to. Type(Executor)
 
     RETURN:
 
         `control_tensor` -> (4(control points of cubic bezier) by 2(x and y coordinates) by number of segments) array
         which contains control points for all segments of the cubic bezier spline. Type(np.ndarray)
     """
-    control_tensor = np.zeros(shape=(4, 2, num_segments))
-    for i in range(0, num_segments):
-        control_tensor[:, :, i] = __fit_bezier(
-            __split_data(curve_data, num_segments)[i], method=method
-        )
-
-    control_tensor[0, :, 0] = curve_data[0]
-    control_tensor[-1, :, -1] = curve_data[-1]
-
-    control_tensor = __enforce_continuity(control_tensor)
-    return control_tensor
+    return get_control_tensors(
+        [curve_data], num_segments, method, parametrization, workers, executor
+    )[0]
 
 
 def bezier_spline(control_tensor: np.ndarray, p_per_seg: int) -> np.ndarray:
@@ -214,17 +524,17 @@ def bezier_spline(control_tensor: np.ndarray, p_per_seg: int) -> np.ndarray:
     PARAMETERS:
 
         `control_tensor` -> (4(control points of cubic bezier) by 2(x and y coordinates) by number of segments) array
-        which contains control points for all segments of the cubic bezier spline. Type(np.ndarray)
+        which contains control points for all segments of the cubic bezier spline.
+        A stack of control tensors, e.g. (foils x 4 x 2 x segments), generates all the splines at once. Type(np.ndarray)
 
         `p_per_seg` -> Number of points in each segment. Type(int)
 
     RETURNS:
 
-        `np.vstack(curves)` -> Array of all the points of the cubic bezier spline. Type(np.ndarray)
+        `curves` -> Array of all the points of the cubic bezier spline, (points x 2)
+        or (..., points x 2) for a stack of control tensors. Type(np.ndarray)
 
     """
-    curves = [
-        cubic_bezier_curve(*control_tensor[:, :, i], n_points=p_per_seg)
-        for i in range(control_tensor.shape[2])
-    ]
-    return np.vstack(curves)
+    # (4 x 2 x segments) -> (segments x 4 x 2) so that all segments are evaluated in one call
+    curves = cubic_bezier_curves(np.moveaxis(control_tensor, -1, -3), n_points=p_per_seg)
+    return curves.reshape(control_tensor.shape[:-3] + (-1, 2))
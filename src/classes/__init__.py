@@ -4,7 +4,8 @@ classes
 
 Module of classes to model different types of aerodynamic geometries, systems and subsystems for design optimization problems.
 
-Contains 1 sub-module:
+Contains 2 sub-modules:
 
 1. `bezierfoil` containing BezierFoil class to geometrically model an airfoil using cubic bezier splines.
+2. `bezierfoilbatch` containing BezierFoilBatch class to hold many bezier aerofoils in contiguous arrays.
 """
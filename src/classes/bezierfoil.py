@@ -6,9 +6,12 @@ Using cubic bezier splines to model aerofoil shapes
 """
 
 import numpy as np
-from parser.parsefoil import split_surfaces
-from bezier.spline import get_control_tensor, bezier_spline
+from parser.parsefoil import split_surfaces, dat_path
+from concurrent.futures import Executor
+from bezier.spline import get_control_tensors, bezier_spline, enforce_continuity
 from database.UIUC_aerofoils import UIUCDict
+from database.control_cache import CONTROL_CACHE
+from database.pca_assets import load_pca_asset
 import os
 
 
@@ -30,6 +33,13 @@ class BezierFoil:
 
         `n_segments` -> number of bezier curve segments in both upper and lower surfaces. Type(int).
 
+        `pca_components_file` -> PCA coefficients npy file used for perturbation. Type(str).
+
+        `mean_pca_foil_file` -> Mean npy file of the perturbing dataset. Type(str).
+
+    The dat file is only parsed and fitted when the coordinates or control points are first used.
+    Aerofoils which already have control points can be created with `from_controls` or `from_vector`.
+
     """
 
     def __init__(
@@ -37,10 +47,14 @@ class BezierFoil:
         database_index: UIUCDict,
         n_segments: int = 10,
         arc_length: float = 0.1,
-        pca_components: str = "naca/naca_pca_components.npy",
-        mean_pca_foil: str = "naca/naca_pca_mean_airfoil.npy",
+        pca_components: str = "NACA/naca_pca_components.npy",
+        mean_pca_foil: str = "NACA/naca_pca_mean_airfoil.npy",
         method: str = "L-BFGS-B",
         param_method: str = "manual",
+        parametrization: str = "uniform",
+        workers: int = 1,
+        executor: Executor | None = None,
+        use_cache: bool = True,
     ) -> None:
         """
         Default constructor for Aerofoil class.
@@ -53,12 +67,24 @@ class BezierFoil:
 
             `arc_length` -> Length of each segment for Arc-Length Parametrization. Type(float).
 
-            `pca_components` -> PCA coefficients npy file for perturbation. Type(str).
+            `pca_components` -> PCA coefficients npy file for perturbation, relative to database/PCA_files.
+                              Only loaded on the first perturbation. Type(str).
 
-            `mean_pca_foil` -> Mean npy file of the perturbing dataset. Type(str).
+            `mean_pca_foil` -> Mean npy file of the perturbing dataset, relative to database/PCA_files. Type(str).
 
             `method` -> The optimization solver to converge the bezier control points,
                       default is Low Memory Broyden-Fletcher-Goldfarb-Shanno solver.
+                      "lstsq" solves the linear least squares problem directly and is much faster.
+                      "global" fits all segments of a surface together with continuity built into the solve.
+
+            `parametrization` -> t parameters of the segment data while fitting: "uniform", "chord_length" or "centripetal". Type(str).
+
+            `workers` -> Number of threads fitting the segments of both surfaces concurrently. 1 fits serially. Type(int).
+
+            `executor` -> Thread or process pool to run the segment fits on instead of `workers` threads. Type(Executor).
+
+            `use_cache` -> Load the control tensors from the on-disk fit cache when the same file was fitted
+                         with the same settings before. False always refits and bypasses the cache. Type(bool).
 
             `param_method` -> Choice of segmentation method: "manual" (fixed n_segments) or "arc_length" (uniform arc-length). Type(str).
         
@@ -69,21 +95,214 @@ class BezierFoil:
         """
         self.database_index = database_index
         self.param_method = param_method
-        self.upper_coords, self.lower_coords = split_surfaces(self.database_index)
-        if self.param_method == "arc_length":
-            self.n_segments = self.compute_optimal_segments(arc=arc_length)
-        else:
-            self.n_segments = n_segments
-        self.upper_control = get_control_tensor(
-            self.upper_coords, self.n_segments, method
-        )
-        self.lower_control = get_control_tensor(
-            self.lower_coords, self.n_segments, method
+        self.arc_length = arc_length
+        self.method = method
+        self.parametrization = parametrization
+        self.workers = workers
+        self.executor = executor
+        self.use_cache = use_cache
+        self.pca_components_file = pca_components
+        self.mean_pca_foil_file = mean_pca_foil
+
+        # Parsing and fitting are deferred until the coordinates or controls are first used
+        self.__coords = None
+        self.__n_segments = None if param_method == "arc_length" else n_segments
+        self.__upper_control = None
+        self.__lower_control = None
+
+    # executors cannot be pickled, aerofoils sent to worker processes fit serially unless given a new one
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["executor"] = None
+        return state
+
+    @classmethod
+    def from_controls(
+        cls,
+        upper_control: np.ndarray,
+        lower_control: np.ndarray,
+        pca_components: str = "NACA/naca_pca_components.npy",
+        mean_pca_foil: str = "NACA/naca_pca_mean_airfoil.npy",
+    ) -> "BezierFoil":
+        """
+        Creates an aerofoil directly from its control tensors, without parsing a .dat file or fitting.
+        The raw coordinates are not available on such aerofoils.
+
+        PARAMETERS:
+
+            `upper_control` -> upper surface control points, 4 x 2 x n_segments. Type(np.ndarray).
+
+            `lower_control` -> lower surface control points, 4 x 2 x n_segments. Type(np.ndarray).
+
+            `pca_components` -> PCA coefficients npy file for perturbation. Type(str).
+
+            `mean_pca_foil` -> Mean npy file of the perturbing dataset. Type(str).
+
+        RETURNS:
+
+            `foil` -> Aerofoil modelled by the given control tensors. Type(BezierFoil).
+        """
+        upper_control = np.array(upper_control, dtype=float)
+        lower_control = np.array(lower_control, dtype=float)
+        if upper_control.shape != lower_control.shape or upper_control.shape[:2] != (4, 2):
+            raise ValueError(
+                "Upper and lower control tensors must both be 4 x 2 x n_segments arrays"
+            )
+
+        foil = cls(
+            None,
+            n_segments=upper_control.shape[2],
+            pca_components=pca_components,
+            mean_pca_foil=mean_pca_foil,
         )
-        self.pca_components = np.load(
-            os.getcwd() + "/src/database/pca_files/" + f"{pca_components}"
+        foil.upper_control = upper_control
+        foil.lower_control = lower_control
+        return foil
+
+    @classmethod
+    def from_vector(
+        cls, control_vector: np.ndarray, n_segments: int, **kwargs
+    ) -> "BezierFoil":
+        """
+        Creates an aerofoil from a control vector, e.g. an optimizer design vector or a dataset row.
+
+        PARAMETERS:
+
+            `control_vector` -> flattened upper control tensor followed by the flattened lower control tensor. Type(np.ndarray).
+
+            `n_segments` -> number of bezier segments of each surface. Type(int).
+
+            `**kwargs` -> passed on to `BezierFoil.from_controls`.
+
+        RETURNS:
+
+            `foil` -> Aerofoil modelled by the control vector. Type(BezierFoil).
+        """
+        control_vector = np.asarray(control_vector, dtype=float)
+        split_idx = 4 * 2 * n_segments
+        if control_vector.shape != (2 * split_idx,):
+            raise ValueError(
+                f"Control vector must have {2 * split_idx} elements for {n_segments} segments"
+            )
+        return cls.from_controls(
+            control_vector[:split_idx].reshape(4, 2, n_segments),
+            control_vector[split_idx:].reshape(4, 2, n_segments),
+            **kwargs,
         )
-        self.mean_airfoil = np.load(os.getcwd() + "/src/database/pca_files/" + f"{mean_pca_foil}")
+
+    @property
+    def upper_coords(self) -> np.ndarray:
+        """
+        Upper surface coordinates from the dat file, parsed on first use. None for aerofoils without a dat file.
+        """
+        coords = self.__load_coords()
+        return None if coords is None else coords[0]
+
+    @property
+    def lower_coords(self) -> np.ndarray:
+        """
+        Lower surface coordinates from the dat file, parsed on first use. None for aerofoils without a dat file.
+        """
+        coords = self.__load_coords()
+        return None if coords is None else coords[1]
+
+    @property
+    def n_segments(self) -> int:
+        """
+        Number of bezier curve segments in both surfaces, computed from the arc length on first use if needed.
+        """
+        if self.__n_segments is None:
+            self.__n_segments = self.compute_optimal_segments(arc=self.arc_length)
+        return self.__n_segments
+
+    @property
+    def upper_control(self) -> np.ndarray:
+        """
+        Upper surface control points (4 x 2 x n_segments), fitted on first use.
+        """
+        if self.__upper_control is None:
+            self.__fit()
+        return self.__upper_control
+
+    @upper_control.setter
+    def upper_control(self, control: np.ndarray) -> None:
+        self.__upper_control = control
+
+    @property
+    def lower_control(self) -> np.ndarray:
+        """
+        Lower surface control points (4 x 2 x n_segments), fitted on first use.
+        """
+        if self.__lower_control is None:
+            self.__fit()
+        return self.__lower_control
+
+    @lower_control.setter
+    def lower_control(self, control: np.ndarray) -> None:
+        self.__lower_control = control
+
+    def __load_coords(self) -> tuple[np.ndarray] | None:
+        """
+        Parses the dat file into upper and lower surface coordinates once.
+        """
+        if self.__coords is None and self.database_index is not None:
+            self.__coords = split_surfaces(self.database_index)
+        return self.__coords
+
+    def __fit(self) -> None:
+        """
+        Fits the control tensors of both surfaces, or loads them from the on-disk fit cache.
+        """
+        if self.database_index is None:
+            raise ValueError("Aerofoil has neither control tensors nor a dat file to fit")
+
+        cached = None
+        if self.use_cache:
+            cache_key = CONTROL_CACHE.key(
+                dat_path(self.database_index),
+                self.n_segments,
+                self.param_method,
+                self.method,
+                self.parametrization,
+            )
+            cached = CONTROL_CACHE.get(cache_key)
+
+        if cached is not None:
+            upper_control, lower_control = cached
+        else:
+            upper_control, lower_control = get_control_tensors(
+                [self.upper_coords, self.lower_coords],
+                self.n_segments,
+                self.method,
+                self.parametrization,
+                self.workers,
+                self.executor,
+            )
+            if self.use_cache:
+                try:
+                    CONTROL_CACHE.put(cache_key, upper_control, lower_control)
+                except OSError:  # the cache is best-effort, e.g. a read-only or full disk
+                    pass
+
+        # Only the controls that were not set already are replaced
+        if self.__upper_control is None:
+            self.__upper_control = upper_control
+        if self.__lower_control is None:
+            self.__lower_control = lower_control
+
+    @property
+    def pca_components(self) -> np.ndarray:
+        """
+        PCA components of the perturbing dataset, loaded on first use and shared between all aerofoils (read-only).
+        """
+        return load_pca_asset(self.pca_components_file)
+
+    @property
+    def mean_airfoil(self) -> np.ndarray:
+        """
+        Mean control vector of the perturbing dataset, loaded on first use and shared between all aerofoils (read-only).
+        """
+        return load_pca_asset(self.mean_pca_foil_file)
 
     def compute_optimal_segments(self, arc):
         """
@@ -112,7 +331,32 @@ class BezierFoil:
 
         return n_segments
     
-    def perturb_pca(self, coefficients, freeze_last_n=1):
+    def perturb_pca_batch(
+        self,
+        coeff_matrix: np.ndarray,
+        freeze_last_n: int = 1,
+        continuity: bool = False,
+    ) -> np.ndarray:
+        """
+        Generates many PCA perturbed shapes of the current aerofoil at once without modifying it.
+        All candidates are produced by a single (coeff_matrix @ pca_components) product,
+        row i being the shape `perturb_pca(coeff_matrix[i])` gives the aerofoil.
+
+        PARAMETERS:
+
+            `coeff_matrix` -> (N x number of PCA modes) coefficients, one row per candidate shape. Type(np.ndarray).
+
+            `freeze_last_n` -> Number of trailing edge segments left unperturbed. Type(int).
+
+            `continuity` -> Enforce C0, C1 and C2 continuity on the perturbed control tensors after the lower surface
+            is clamped below the upper one. Type(bool).
+
+        RETURNS:
+
+            `shapes` -> (N x control vector) array, each row is the flattened upper control tensor
+            followed by the flattened lower control tensor. Type(np.ndarray).
+        """
+        coeff_matrix = np.atleast_2d(np.asarray(coeff_matrix, dtype=float))
 
         # Flatten current shape
         current_shape = np.concatenate(
@@ -124,32 +368,60 @@ class BezierFoil:
                 f"Shape mismatch: {current_shape.shape} vs {self.mean_airfoil.shape}"
             )
 
-        # Apply PCA perturbations
-        perturbation = sum(
-            coeff * pca_comp
-            for coeff, pca_comp in zip(coefficients, self.pca_components)
-        )
+        # Apply PCA perturbations, one row per candidate
+        n_modes = min(coeff_matrix.shape[1], len(self.pca_components))
+        perturbations = coeff_matrix[:, :n_modes] @ self.pca_components[:n_modes]
 
         # Prevent modification of the last 'freeze_last_n' segments
         if freeze_last_n > 0:
-            perturbation[-2 * freeze_last_n :] = (
+            perturbations[:, -2 * freeze_last_n :] = (
                 0  # Ensuring trailing edge points remain unchanged
             )
 
-        # Apply perturbation
-        current_shape += perturbation
+        shapes = current_shape + perturbations
 
         # Split back into upper and lower surfaces
+        n_shapes = len(shapes)
         split_idx = self.upper_control.size
-        perturbed_upper = current_shape[:split_idx].reshape(self.upper_control.shape)
-        perturbed_lower = current_shape[split_idx:].reshape(self.lower_control.shape)
+        perturbed_upper = shapes[:, :split_idx].reshape(
+            n_shapes, *self.upper_control.shape
+        )
+        perturbed_lower = shapes[:, split_idx:].reshape(
+            n_shapes, *self.lower_control.shape
+        )
 
         # Ensure lower surface does not exceed upper surface at each x
         perturbed_lower = np.minimum(perturbed_lower, perturbed_upper - 1e-5)
 
+        if continuity:
+            perturbed_upper = enforce_continuity(perturbed_upper)
+            perturbed_lower = enforce_continuity(perturbed_lower)
+
+        return np.concatenate(
+            [perturbed_upper.reshape(n_shapes, -1), perturbed_lower.reshape(n_shapes, -1)],
+            axis=1,
+        )
+
+    def perturb_pca(self, coefficients, freeze_last_n=1):
+        """
+        Perturbs the aerofoil in place along the PCA modes.
+
+        PARAMETERS:
+
+            `coefficients` -> Coefficient of each PCA mode. Type(np.ndarray).
+
+            `freeze_last_n` -> Number of trailing edge segments left unperturbed. Type(int).
+
+        RETURNS:
+
+            None
+        """
+        shape = self.perturb_pca_batch(np.asarray(coefficients)[np.newaxis], freeze_last_n)[0]
+
         # Assign modified controls
-        self.upper_control = perturbed_upper
-        self.lower_control = perturbed_lower
+        split_idx = self.upper_control.size
+        self.upper_control = shape[:split_idx].reshape(self.upper_control.shape)
+        self.lower_control = shape[split_idx:].reshape(self.lower_control.shape)
 
     def close_curve(self) -> None:
         """
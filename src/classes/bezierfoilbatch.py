@@ -0,0 +1,324 @@
+"""
+classes.bezierfoilbatch
+=======================
+
+Struct-of-arrays container for many aerofoils modelled using cubic bezier splines
+"""
+
+import operator
+import os
+import numpy as np
+from bezier.spline import bezier_spline, enforce_continuity
+from classes.bezierfoil import BezierFoil
+
+
+class BezierFoilBatch:
+    """
+    Objects of this class hold K aerofoils in contiguous arrays instead of K BezierFoil objects.
+    All the operations act on every aerofoil at once.
+
+    ATTRIBUTES
+
+        `upper_control` -> upper surface control points of all aerofoils, K x 4 x 2 x n_segments. Type(np.ndarray).
+
+        `lower_control` -> lower surface control points of all aerofoils, K x 4 x 2 x n_segments. Type(np.ndarray).
+
+        `names` -> header names of the aerofoils, or None. Type(np.ndarray).
+
+    """
+
+    __slots__ = ("upper_control", "lower_control", "names")
+
+    def __init__(
+        self,
+        upper_control: np.ndarray,
+        lower_control: np.ndarray,
+        names: list[str] | None = None,
+    ) -> None:
+        """
+        Default constructor for BezierFoilBatch class. The arrays are used as given, without copying.
+
+        PARAMETERS:
+
+            `upper_control` -> upper surface control points, K x 4 x 2 x n_segments. Type(np.ndarray).
+
+            `lower_control` -> lower surface control points, K x 4 x 2 x n_segments. Type(np.ndarray).
+
+            `names` -> header names of the K aerofoils. Type(list[str]).
+
+        RETURNS:
+
+            None
+        """
+        upper_control = np.asarray(upper_control, dtype=float)
+        lower_control = np.asarray(lower_control, dtype=float)
+        if upper_control.ndim != 4 or upper_control.shape[1:3] != (4, 2):
+            raise ValueError("Control tensors must be K x 4 x 2 x n_segments arrays")
+        if upper_control.shape != lower_control.shape:
+            raise ValueError(
+                f"Shape mismatch: {upper_control.shape} vs {lower_control.shape}"
+            )
+        if names is not None and len(names) != len(upper_control):
+            raise ValueError(f"Expected {len(upper_control)} names, got {len(names)}")
+
+        self.upper_control = upper_control
+        self.lower_control = lower_control
+        self.names = None if names is None else np.asarray(names, dtype=str)
+
+    @classmethod
+    def from_foils(cls, foils: list[BezierFoil]) -> "BezierFoilBatch":
+        """
+        Packs BezierFoil objects into a batch. All aerofoils must have the same number of segments.
+
+        PARAMETERS:
+
+            `foils` -> aerofoils to pack. Type(list[BezierFoil]).
+
+        RETURNS:
+
+            `batch` -> batch holding a copy of the control tensors. Type(BezierFoilBatch).
+        """
+        names = [foil.database_index for foil in foils]
+        return cls(
+            np.stack([foil.upper_control for foil in foils]),
+            np.stack([foil.lower_control for foil in foils]),
+            None if None in names else names,
+        )
+
+    @classmethod
+    def from_vectors(
+        cls, vectors: np.ndarray, n_segments: int, names: list[str] | None = None
+    ) -> "BezierFoilBatch":
+        """
+        Creates a batch from control vectors, e.g. the output of `BezierFoil.perturb_pca_batch`.
+
+        PARAMETERS:
+
+            `vectors` -> K x control vector array, the flattened upper control tensor followed by the lower one. Type(np.ndarray).
+
+            `n_segments` -> number of bezier segments of each surface. Type(int).
+
+            `names` -> header names of the K aerofoils. Type(list[str]).
+
+        RETURNS:
+
+            `batch` -> batch viewing the given vectors. Type(BezierFoilBatch).
+        """
+        vectors = np.asarray(vectors, dtype=float)
+        split_idx = 4 * 2 * n_segments
+        if vectors.ndim != 2 or vectors.shape[1] != 2 * split_idx:
+            raise ValueError(
+                f"Control vectors must be K x {2 * split_idx} arrays for {n_segments} segments"
+            )
+        return cls(
+            vectors[:, :split_idx].reshape(-1, 4, 2, n_segments),
+            vectors[:, split_idx:].reshape(-1, 4, 2, n_segments),
+            names,
+        )
+
+    def to_vectors(self) -> np.ndarray:
+        """
+        Flattens the batch into control vectors, the upper control tensor followed by the lower one.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            `vectors` -> K x control vector array. Type(np.ndarray).
+        """
+        return np.concatenate(
+            [self.upper_control.reshape(len(self), -1), self.lower_control.reshape(len(self), -1)],
+            axis=1,
+        )
+
+    def foil(self, index: int, **kwargs) -> BezierFoil:
+        """
+        Creates a BezierFoil object from one aerofoil of the batch.
+
+        PARAMETERS:
+
+            `index` -> position of the aerofoil in the batch. Type(int).
+
+            `**kwargs` -> passed on to `BezierFoil.from_controls`.
+
+        RETURNS:
+
+            `foil` -> aerofoil holding a copy of the control tensors. Type(BezierFoil).
+        """
+        foil = BezierFoil.from_controls(
+            self.upper_control[index], self.lower_control[index], **kwargs
+        )
+        if self.names is not None:
+            foil.database_index = str(self.names[index])
+        return foil
+
+    def to_foils(self, **kwargs) -> list[BezierFoil]:
+        """
+        Creates a BezierFoil object for every aerofoil of the batch.
+
+        PARAMETERS:
+
+            `**kwargs` -> passed on to `BezierFoil.from_controls`.
+
+        RETURNS:
+
+            `foils` -> aerofoils of the batch, in order. Type(list[BezierFoil]).
+        """
+        return [self.foil(i, **kwargs) for i in range(len(self))]
+
+    @property
+    def n_segments(self) -> int:
+        """
+        Number of bezier curve segments in both surfaces of every aerofoil.
+        """
+        return self.upper_control.shape[3]
+
+    def __len__(self) -> int:
+        return len(self.upper_control)
+
+    def __getitem__(self, index) -> "BezierFoilBatch":
+        """
+        Selects a sub-batch. Slices return views of the control arrays, integers return a batch of one aerofoil.
+        """
+        try:
+            i = operator.index(index)
+        except TypeError:  # slices, masks and index arrays
+            pass
+        else:
+            n = len(self)
+            if not -n <= i < n:
+                raise IndexError(f"aerofoil index {i} out of range for a batch of {n}")
+            i %= n
+            index = slice(i, i + 1)
+        return BezierFoilBatch(
+            self.upper_control[index],
+            self.lower_control[index],
+            None if self.names is None else self.names[index],
+        )
+
+    def enforce_continuity(self) -> None:
+        """
+        Enforces C0, C1 and C2 continuity on both surfaces of all aerofoils.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        enforce_continuity(self.upper_control)
+        enforce_continuity(self.lower_control)
+
+    def close_curve(self) -> None:
+        """
+        Forces the leading edge to (0,0) and the trailing edge to (1,0) on all aerofoils, see `BezierFoil.close_curve`.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        self.lower_control[:, 0, :, 0] = self.upper_control[:, 0, :, 0] = np.array([0, 0])
+        self.lower_control[:, -1, :, -1] = self.upper_control[:, -1, :, -1] = np.array([1, 0])
+
+    def getUpperCurves(self, points_per_seg: int) -> np.ndarray:
+        """
+        To generate the upper surface cubic bezier spline coordinates of all aerofoils
+
+        PARAMETERS:
+
+            `points_per_seg` -> Number of points in each cubic bezier segment. Type(int).
+
+        RETURNS:
+
+            `bezier_spline(self.upper_control, points_per_seg)` -> K x points x 2 upper surface coordinates. Type(np.ndarray).
+        """
+        return bezier_spline(self.upper_control, points_per_seg)
+
+    def getLowerCurves(self, points_per_seg: int) -> np.ndarray:
+        """
+        To generate the lower surface cubic bezier spline coordinates of all aerofoils
+
+        PARAMETERS:
+
+            `points_per_seg` -> Number of points in each cubic bezier segment. Type(int).
+
+        RETURNS:
+
+            `bezier_spline(self.lower_control, points_per_seg)` -> K x points x 2 lower surface coordinates. Type(np.ndarray).
+        """
+        return bezier_spline(self.lower_control, points_per_seg)
+
+    def selig_coords(self, points_per_seg: int) -> np.ndarray:
+        """
+        Coordinates of all aerofoils in selig order, trailing edge over the upper surface to the leading edge
+        and back over the lower surface, as written by `BezierFoil.save_foil`.
+
+        PARAMETERS:
+
+            `points_per_seg` -> Number of points in each cubic bezier segment. Type(int).
+
+        RETURNS:
+
+            `coords` -> K x points x 2 coordinates. Type(np.ndarray).
+        """
+        upper = np.flip(self.getUpperCurves(points_per_seg), axis=1)
+        lower = self.getLowerCurves(points_per_seg)
+        return np.concatenate((upper, lower), axis=1)
+
+    def save_foils(
+        self,
+        save_folder: str,
+        points_per_seg: int,
+        write_precision: int,
+        save_filenames: list[str] | None = None,
+    ) -> None:
+        """
+        To save all cubic bezier interpolated aerofoils as .dat files. The curves of all aerofoils are generated in one call.
+
+        PARAMETERS:
+            `save_folder` -> The folder in the current working directory where the files will be saved. Type(str)
+
+            `points_per_seg` -> Number of points in each cubic bezier segment. Type(int).
+
+            `write_precision` -> The floating point precision of the co-ordinates in the saved files. Type(int)
+
+            `save_filenames` -> Names of the .dat files, defaults to "<name>.dat" or "foil_<index>.dat". Type(list[str])
+
+        RETURNS:
+
+            None
+
+        """
+        headers = (
+            [f"foil_{i}" for i in range(len(self))]
+            if self.names is None
+            else [str(name) for name in self.names]
+        )
+        if save_filenames is None:
+            save_filenames = [f"{os.path.splitext(header)[0]}.dat" for header in headers]
+
+        FOLDER_PATH = os.getcwd() + "/" + save_folder
+        if not os.path.exists(FOLDER_PATH):
+            os.mkdir(FOLDER_PATH)
+            print(f"{save_folder} created in the current working directory")
+
+        coords = self.selig_coords(points_per_seg)
+        fmt = f"%.{write_precision}f"
+        for header, filename, foil_coords in zip(headers, save_filenames, coords):
+            np.savetxt(
+                FOLDER_PATH + "/" + filename,
+                foil_coords,
+                fmt=fmt,
+                header=header,
+                comments="",
+            )
+
+        print(f"{len(self)} aerofoils saved in {FOLDER_PATH}")
@@ -4,8 +4,11 @@ database
 
 Module of important data stored in a well defined andd structured format.
 
-Contains 2 sub-modules:
+Contains 5 sub-modules:
 
 1. `basis_matrices` containing matrices cached for calculating the curve points using the characteristic form of parametrized curves.
 2. `UIUC_aerofoils` containing database for the aerofoils from the UIUC Airfoil Coordinates Database. Source - https://m-selig.ae.illinois.edu/ads/coord_database.html.
+3. `control_cache` containing the persistent on-disk cache of fitted aerofoil control tensors.
+4. `pca_assets` containing the lazily loaded, process wide registry of the PCA perturbation bases.
+5. `uiuc_corpus` containing the memory mapped packed store of all the UIUC aerofoil coordinates.
 """
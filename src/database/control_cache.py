@@ -0,0 +1,211 @@
+"""
+database.control_cache
+======================
+
+Persistent on-disk cache of fitted control tensors.
+Entries are keyed by the content of the .dat file and the fit settings, so refitting the same aerofoil is a file read.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+CACHE_VERSION = 1
+"""
+Bumped whenever the fitting algorithms change the control tensors they produce, invalidating older entries.
+"""
+
+DEFAULT_CACHE_FOLDER: str = os.environ.get(
+    "AEROPTIMA_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "aeroptima")
+)
+"""
+Root folder of the local aeroptima caches. Can be overridden with the AEROPTIMA_CACHE environment variable.
+"""
+
+
+class ControlTensorCache:
+    """
+    Content addressed store of the upper and lower control tensors of fitted aerofoils.
+    Each entry is a single .npy file, the least recently used entries are evicted once the store exceeds its size limit.
+    The size of the store is measured when it is first written to and estimated from the entries written since,
+    so the folder is only scanned again when the estimate exceeds the limit.
+
+    ATTRIBUTES
+
+        `folder` -> Folder holding the cached entries. Type(str).
+
+        `max_bytes` -> Size limit of the store in bytes. Type(int).
+
+    """
+
+    def __init__(
+        self,
+        folder: str = os.path.join(DEFAULT_CACHE_FOLDER, "control_tensors"),
+        max_bytes: int = 256 * 2**20,
+    ) -> None:
+        """
+        Default constructor for ControlTensorCache class.
+
+        PARAMETERS:
+
+            `folder` -> Folder holding the cached entries, created on the first write. Type(str).
+
+            `max_bytes` -> Size limit of the store in bytes. Type(int).
+
+        RETURNS:
+
+            None
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.__size = None  # estimated size of the store in bytes, None until measured by `evict`
+
+    def key(
+        self,
+        dat_path: str,
+        n_segments: int,
+        param_method: str,
+        method: str,
+        parametrization: str,
+    ) -> str:
+        """
+        Calculates the cache key of a fit from the .dat file content and the fit settings.
+
+        PARAMETERS:
+
+            `dat_path` -> Path of the fitted .dat file. Type(str).
+
+            `n_segments` -> Number of bezier segments per surface. Type(int).
+
+            `param_method` -> Segmentation method of the aerofoil. Type(str).
+
+            `method` -> Solver used to fit the control points. Type(str).
+
+            `parametrization` -> t parameters of the segment data. Type(str).
+
+        RETURNS:
+
+            `key` -> Hex digest identifying the fit. Type(str).
+        """
+        with open(dat_path, "rb") as f:
+            file_hash = hashlib.sha256(f.read()).hexdigest()
+        settings = json.dumps(
+            [CACHE_VERSION, file_hash, n_segments, param_method, method, parametrization]
+        )
+        return hashlib.sha256(settings.encode()).hexdigest()
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.folder, key + ".npy")
+
+    def get(self, key: str) -> tuple[np.ndarray] | None:
+        """
+        Loads the control tensors of a cached fit.
+
+        PARAMETERS:
+
+            `key` -> Cache key of the fit. Type(str).
+
+        RETURNS:
+
+            `upper_control, lower_control` or None if the fit is not cached. Type(tuple[np.ndarray])
+        """
+        path = self.__path(key)
+        try:
+            controls = np.load(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:  # e.g. a read-only store
+            pass
+        return controls[0], controls[1]
+
+    def put(self, key: str, upper_control: np.ndarray, lower_control: np.ndarray) -> None:
+        """
+        Stores the control tensors of a fit and evicts old entries if the store is estimated to be too large.
+
+        PARAMETERS:
+
+            `key` -> Cache key of the fit. Type(str).
+
+            `upper_control` -> Upper surface control tensor. Type(np.ndarray).
+
+            `lower_control` -> Lower surface control tensor. Type(np.ndarray).
+
+        RETURNS:
+
+            None
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        # write to a temporary file first so concurrent readers never see partial entries
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.stack((upper_control, lower_control)))
+            size = f.tell()
+        os.replace(temp_path, self.__path(key))
+
+        if self.__size is not None:
+            self.__size += size
+        if self.__size is None or self.__size > self.max_bytes:
+            # one percent of headroom, so a full store is not scanned again on every write
+            self.evict(self.max_bytes - self.max_bytes // 100)
+
+    def evict(self, max_bytes: int | None = None) -> None:
+        """
+        Removes the least recently used entries until the store fits in `max_bytes`.
+
+        PARAMETERS:
+
+            `max_bytes` -> Size the store is reduced to, defaults to the size limit of the store. Type(int).
+
+        RETURNS:
+
+            None
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries = []
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # removed by another process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.__size = total
+
+    def clear(self) -> None:
+        """
+        Removes all the cached entries.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        if os.path.isdir(self.folder):
+            for entry in os.scandir(self.folder):
+                if entry.name.endswith((".npy", ".tmp")):
+                    os.remove(entry.path)
+        self.__size = 0
+
+
+CONTROL_CACHE = ControlTensorCache()
+"""
+Process wide cache used by BezierFoil.
+"""
@@ -0,0 +1,66 @@
+"""
+database.pca_assets
+===================
+
+Process wide lazy registry of the PCA bases used to perturb aerofoil shapes
+"""
+
+import os
+from functools import lru_cache
+import numpy as np
+
+PCA_FOLDER: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PCA_files")
+"""
+Folder containing the PCA components and mean aerofoils of the perturbing datasets.
+"""
+
+
+def __resolve(filename: str) -> str:
+    """
+    Finds a PCA file relative to the PCA folder. Folder and file names are matched
+    case-insensitively when the exact path does not exist, e.g. "naca/..." finds "NACA/...".
+
+    PARAMETERS:
+
+        `filename` -> Path of the npy file relative to the PCA folder, or an absolute path. Type(str)
+
+    RETURNS:
+
+        `path` -> Path of the npy file. Type(str)
+    """
+    path = os.path.join(PCA_FOLDER, filename)
+    if os.path.isfile(path):
+        return path
+
+    path = PCA_FOLDER
+    for part in filename.replace("\\", "/").split("/"):
+        if os.path.exists(os.path.join(path, part)) or not os.path.isdir(path):
+            path = os.path.join(path, part)
+            continue
+        matches = [name for name in os.listdir(path) if name.lower() == part.lower()]
+        path = os.path.join(path, matches[0] if matches else part)
+
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"PCA file '{filename}' not found in '{PCA_FOLDER}'")
+    return path
+
+
+@lru_cache(maxsize=None)
+def __load(path: str) -> np.ndarray:
+    return np.load(path, mmap_mode="r")
+
+
+def load_pca_asset(filename: str) -> np.ndarray:
+    """
+    Loads a PCA npy file once per process and returns the same read-only memory mapped array on every call.
+    Arrays loaded before forking worker processes share their pages with the workers.
+
+    PARAMETERS:
+
+        `filename` -> Path of the npy file relative to the PCA folder, e.g. "NACA/naca_pca_components.npy". Type(str)
+
+    RETURNS:
+
+        `asset` -> Read-only memory mapped array. Type(np.ndarray)
+    """
+    return __load(__resolve(filename))
@@ -0,0 +1,297 @@
+"""
+database.uiuc_corpus
+====================
+
+Packed binary store of all the aerofoils in the UIUC_aerofoils folder.
+The coordinates of every aerofoil are concatenated into one float64 array with an offset index,
+so looking an aerofoil up is a slice of a memory mapped file instead of parsing a text file.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from database.control_cache import DEFAULT_CACHE_FOLDER
+from parser.parsefoil import dat_path, parse_foil
+
+CORPUS_VERSION = 1
+"""
+Bumped whenever the layout of the store or the parser changes, forcing a rebuild.
+"""
+
+FORMATS = ("selig", "lednicer")
+"""
+Coordinate formats, indexed by the format codes of the store.
+"""
+
+ARRAYS = ("coords", "offsets", "split", "format", "names", "headers")
+"""
+Arrays of a store, each saved as <name>.npy:
+
+    `coords` -> (M, 2) coordinates of all the aerofoils in file order, concatenated.
+
+    `offsets` -> (N + 1,) start of every aerofoil in `coords`, and the total number of points.
+
+    `split` -> (N,) index of the last upper surface point of every aerofoil, relative to its start.
+
+    `format` -> (N,) format code of every aerofoil, see `FORMATS`.
+
+    `names` -> (N,) .dat file names, sorted.
+
+    `headers` -> (N,) aerofoil names from the first line of the files.
+"""
+
+
+class UIUCCorpus:
+    """
+    Memory mapped packed store of an aerofoil folder, built on first use and rebuilt whenever a .dat file
+    is added, removed or modified (by modification time).
+
+    ATTRIBUTES
+
+        `folder` -> Folder holding the store. Type(str).
+
+        `source` -> Folder of the .dat files, the aerofoil folder of `parser.parsefoil`. Type(str).
+
+        `errors` -> .dat files that could not be parsed and are missing from the store. Type(list[str]).
+
+    """
+
+    def __init__(
+        self,
+        folder: str = os.path.join(DEFAULT_CACHE_FOLDER, "uiuc_corpus"),
+    ) -> None:
+        """
+        Default constructor for UIUCCorpus class. The store is loaded by the first lookup.
+
+        PARAMETERS:
+
+            `folder` -> Folder holding the store. Type(str).
+
+        RETURNS:
+
+            None
+        """
+        self.folder = folder
+        self.source = os.path.dirname(dat_path(""))  # the folder `parse_foil` reads from
+        self.errors = []
+        self.__arrays = None
+        self.__index = None
+
+    def __manifest_path(self) -> str:
+        return os.path.join(self.folder, "manifest.json")
+
+    def __sources(self) -> dict:
+        """
+        Modification times in nanoseconds of the .dat files in the source folder, by file name.
+        """
+        return {
+            entry.name: entry.stat().st_mtime_ns
+            for entry in os.scandir(self.source)
+            if entry.name.endswith(".dat") and entry.is_file()
+        }
+
+    def __read_manifest(self) -> dict | None:
+        try:
+            with open(self.__manifest_path(), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_stale(self) -> bool:
+        """
+        Checks whether the store is missing or out of date with the source folder.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            `stale` -> True if the store has to be rebuilt. Type(bool)
+        """
+        manifest = self.__read_manifest()
+        return (
+            manifest is None
+            or manifest.get("version") != CORPUS_VERSION
+            or manifest.get("source") != os.path.abspath(self.source)
+            or manifest.get("files") != self.__sources()
+        )
+
+    def build(self) -> None:
+        """
+        Parses every .dat file of the source folder and writes the packed store.
+        The arrays are written into a new sub folder and the manifest pointing at it is replaced last,
+        so readers never see a partially written store.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        sources = self.__sources()
+        names, headers, formats, splits, blocks, errors = [], [], [], [], [], []
+        for name in sorted(sources):
+            try:
+                file_format, coords, upper, _ = parse_foil(name)
+                with open(os.path.join(self.source, name), "r") as f:
+                    header = f.readline().strip()
+            except (OSError, ValueError, IndexError):
+                errors.append(name)
+                continue
+            # selig upper surfaces run backwards from the leading edge, lednicer ones forwards to the trailing edge
+            split = len(upper) - 1
+            names.append(name)
+            headers.append(header)
+            formats.append(FORMATS.index(file_format))
+            splits.append(split)
+            blocks.append(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+
+        lengths = np.array([len(block) for block in blocks], dtype=np.int64)
+        arrays = {
+            "coords": np.concatenate(blocks) if blocks else np.empty((0, 2)),
+            "offsets": np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+            "split": np.array(splits, dtype=np.int64),
+            "format": np.array(formats, dtype=np.uint8),
+            "names": np.array(names, dtype=str),
+            "headers": np.array(headers, dtype=str),
+        }
+
+        os.makedirs(self.folder, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix="build_", dir=self.folder)
+        for key, array in arrays.items():
+            np.save(os.path.join(build_dir, key + ".npy"), array)
+
+        old = self.__read_manifest()
+        manifest = {
+            "version": CORPUS_VERSION,
+            "source": os.path.abspath(self.source),
+            "build": os.path.basename(build_dir),
+            "files": sources,
+            "errors": errors,
+        }
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.__manifest_path())
+
+        if old is not None and old.get("build") and old["build"] != manifest["build"]:
+            # mapped arrays of the old build stay readable on POSIX until they are closed
+            shutil.rmtree(os.path.join(self.folder, old["build"]), ignore_errors=True)
+        self.__arrays = None
+        self.__index = None
+
+    def load(self, check: bool = True) -> None:
+        """
+        Memory maps the store, rebuilding it first if it is stale.
+
+        PARAMETERS:
+
+            `check` -> Compare the modification times of the source files with the manifest. Type(bool)
+
+        RETURNS:
+
+            None
+        """
+        manifest = self.__read_manifest()
+        if manifest is None or (check and self.is_stale()):
+            self.build()
+            manifest = self.__read_manifest()
+        build_dir = os.path.join(self.folder, manifest["build"])
+        self.__arrays = {
+            key: np.load(os.path.join(build_dir, key + ".npy"), mmap_mode="r")
+            for key in ARRAYS
+        }
+        self.__index = {str(name): i for i, name in enumerate(self.__arrays["names"])}
+        self.errors = manifest.get("errors", [])
+
+    def __lookup(self, name: str) -> int:
+        if self.__arrays is None:
+            self.load()
+        if name not in self.__index and name + ".dat" in self.__index:
+            name = name + ".dat"
+        try:
+            return self.__index[name]
+        except KeyError:
+            raise KeyError(f"Aerofoil '{name}' is not in the UIUC corpus") from None
+
+    @property
+    def names(self) -> list[str]:
+        """
+        File names of the aerofoils in the store, sorted.
+        """
+        if self.__arrays is None:
+            self.load()
+        return list(self.__index)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        try:
+            self.__lookup(name)
+        except KeyError:
+            return False
+        return True
+
+    def get(self, name: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Looks the coordinates of an aerofoil up. The arrays are read-only views of the memory mapped store.
+
+        PARAMETERS:
+
+            `name` -> .dat file name, with or without the extension. Type(str)
+
+        RETURNS:
+
+            `coords, upper, lower` -> Coordinates in file order and the upper and lower surfaces, the same as
+            `parser.parsefoil.parse_foil`. Type(tuple[np.ndarray])
+        """
+        i = self.__lookup(name)
+        arrays = self.__arrays
+        start, stop = arrays["offsets"][i], arrays["offsets"][i + 1]
+        coords = arrays["coords"][start:stop]
+        split = arrays["split"][i]
+        if FORMATS[arrays["format"][i]] == "selig":
+            return coords, coords[split::-1], coords[split:]
+        return coords, coords[: split + 1], coords[split + 1 :]
+
+    def header(self, name: str) -> str:
+        """
+        Aerofoil name from the first line of its .dat file.
+
+        PARAMETERS:
+
+            `name` -> .dat file name, with or without the extension. Type(str)
+
+        RETURNS:
+
+            `header` -> Aerofoil name. Type(str)
+        """
+        i = self.__lookup(name)
+        return str(self.__arrays["headers"][i])
+
+    def format(self, name: str) -> str:
+        """
+        Coordinate format of an aerofoil's .dat file.
+
+        PARAMETERS:
+
+            `name` -> .dat file name, with or without the extension. Type(str)
+
+        RETURNS:
+
+            `selig` or `lednicer` -> file type. Type(str)
+        """
+        i = self.__lookup(name)
+        return FORMATS[self.__arrays["format"][i]]
+
+
+UIUC_CORPUS = UIUCCorpus()
+"""
+Process wide packed store of the UIUC_aerofoils folder.
+"""
@@ -8,8 +8,14 @@ Implements:
 
 1. Parsing of selig and lednicer format aerofoil .dat files into coordinates in the form of numpy array
 2. Splitting the aerofoil coordinates into upper and lower surfaces for independent control over each surface.
+3. Single pass parsing of a .dat file into its format, coordinates and surfaces at once.
+4. Parsing of coordinates held in memory as text or bytes, from open file objects or from any path.
+5. Streaming whole folders of .dat files, loaded concurrently ahead of the consumer.
+6. Normalizing aerofoils to a unit chord along the x axis, without coincident points, with a measured or closed trailing edge gap.
 
-Contains 1 sub-module:
-1. `aerofoil` containing parsers for selig and lednicer format .dat files,
+Contains 3 sub-modules:
+1. `parsefoil` containing parsers for selig and lednicer format .dat files,
 along with functionality for splitting upper and lower surface coordinates
+2. `stream` containing a concurrent generator streaming the aerofoils of whole folders
+3. `normalize` containing the vectorized geometry normalization of single aerofoils and padded batches
 """
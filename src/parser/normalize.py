@@ -0,0 +1,167 @@
+"""
+parser.normalize
+================
+
+Geometry normalization of parsed aerofoils: coincident points are removed, the leading edge is taken as the point
+farthest from the trailing edge, and the aerofoil is derotated, translated and scaled so that the leading edge
+lies at (0, 0) and the trailing edge midpoint at (1, 0). The trailing edge gap is measured and optionally closed.
+
+Every operation is vectorized over a padded batch of aerofoils, a single aerofoil is a batch of one.
+"""
+
+import numpy as np
+
+
+def __pad(foils: list[tuple[np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Joins the surfaces of every aerofoil into one loop from the upper trailing edge around the leading edge
+    to the lower trailing edge, padded with NaN to the longest loop. The leading edge point both surfaces share is kept once.
+    """
+    loops = []
+    for upper, lower in foils:
+        upper, lower = np.asarray(upper, dtype=float), np.asarray(lower, dtype=float)
+        shared = len(upper) > 0 and len(lower) > 0 and np.array_equal(upper[0], lower[0])
+        loops.append(np.concatenate((upper[::-1], lower[1:] if shared else lower)))
+    counts = np.array([len(loop) for loop in loops], dtype=np.int64)
+    coords = np.full((len(loops), counts.max(initial=0), 2), np.nan)
+    mask = np.arange(coords.shape[1]) < counts[:, None]
+    coords[mask] = np.concatenate(loops) if loops else np.empty((0, 2))
+    return coords, mask
+
+
+def __gather(coords: np.ndarray, index: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Points of every aerofoil at `index`, NaN where not `valid`.
+    """
+    index = np.clip(index, 0, max(coords.shape[1] - 1, 0))
+    points = np.take_along_axis(coords, index[..., None], axis=1)
+    points[~valid] = np.nan
+    return points
+
+
+def normalize_batch(
+    foils: list[tuple[np.ndarray]], close_te: bool = False, tol: float = 1e-9
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+    """
+    Normalizes many aerofoils at once. Aerofoils without a chord, e.g. with all their points coinciding, raise a ValueError.
+
+    PARAMETERS:
+
+        `foils` -> (upper, lower) surface coordinates of every aerofoil, both from the leading edge to the trailing edge
+        as returned by the parsers. Type(list[tuple[np.ndarray]])
+
+        `close_te` -> Close the trailing edge gap by shearing each surface linearly with x. Type(bool)
+
+        `tol` -> Distance below which consecutive points are coincident, relative to the original coordinates. Type(float)
+
+    RETURNS:
+
+        `upper, upper_mask, lower, lower_mask, info` -> (K, N, 2) normalized surfaces from the leading edge to the trailing edge,
+        padded with NaN, the (K, N) masks of their valid points, and a dictionary of (K,) arrays with the original `chord`,
+        the chord `angle` in degrees that was removed, the normalized `te_gap`, the `le_index` in the cleaned loop
+        and the number of `removed` coincident points. Type(tuple)
+    """
+    coords, mask = __pad(foils)
+    width = mask.shape[1]
+    n_points = mask.sum(axis=1)
+    if len(foils) == 0:
+        empty = np.empty((0, 0, 2))
+        info = {key: np.empty(0) for key in ("chord", "angle", "te_gap")}
+        info.update(le_index=np.empty(0, dtype=np.int64), removed=np.empty(0, dtype=np.int64))
+        return empty, np.empty((0, 0), dtype=bool), empty.copy(), np.empty((0, 0), dtype=bool), info
+
+    # drop points coinciding with their predecessor and compact the remaining ones to the front
+    keep = mask.copy()
+    step = np.linalg.norm(np.diff(coords, axis=1), axis=-1)
+    keep[:, 1:] &= ~(step <= tol)
+    order = np.argsort(~keep, axis=1, kind="stable")
+    coords = np.take_along_axis(coords, order[..., None], axis=1)
+    counts = keep.sum(axis=1)
+    mask = np.arange(width) < counts[:, None]
+    coords[~mask] = np.nan
+
+    if np.any(counts == 0):
+        raise ValueError(f"no coordinates in aerofoil(s) {np.flatnonzero(counts == 0).tolist()}")
+
+    last = np.maximum(counts - 1, 0)
+    first_point = coords[:, 0]
+    last_point = np.take_along_axis(coords, last[:, None, None], axis=1)[:, 0]
+    te = (first_point + last_point) / 2
+
+    # leading edge is the point farthest from the trailing edge
+    distance = np.linalg.norm(coords - te[:, None], axis=-1)
+    distance[~mask] = -np.inf
+    le_index = np.argmax(distance, axis=1)
+    le = np.take_along_axis(coords, le_index[:, None, None], axis=1)[:, 0]
+
+    chord_vector = te - le
+    chord = np.linalg.norm(chord_vector, axis=-1)
+    degenerate = ~(chord > tol)  # also catches NaN coordinates
+    if np.any(degenerate):
+        raise ValueError(
+            f"zero chord: the points of aerofoil(s) {np.flatnonzero(degenerate).tolist()} coincide"
+        )
+    angle = np.arctan2(chord_vector[:, 1], chord_vector[:, 0])
+    cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    relative = coords - le[:, None]
+    coords = np.stack(
+        (
+            cos * relative[..., 0] + sin * relative[..., 1],
+            cos * relative[..., 1] - sin * relative[..., 0],
+        ),
+        axis=-1,
+    ) / chord[:, None, None]
+
+    first_point = coords[:, 0]
+    last_point = np.take_along_axis(coords, last[:, None, None], axis=1)[:, 0]
+    te_gap = np.linalg.norm(first_point - last_point, axis=-1)
+
+    if close_te:
+        # shear each surface so its trailing edge point moves onto (1, 0), leaving the leading edge in place
+        te_point = np.array([1.0, 0.0])
+        on_upper = (np.arange(width) <= le_index[:, None])[..., None]
+        end = np.where(on_upper, first_point[:, None], last_point[:, None])
+        coords = coords - coords[..., :1] / end[..., :1] * (end - te_point)
+
+    j = np.arange(width)
+    upper_mask = j <= le_index[:, None]
+    lower_mask = j < (counts - le_index)[:, None]
+    upper = __gather(coords, le_index[:, None] - j, upper_mask)
+    lower = __gather(coords, le_index[:, None] + j, lower_mask)
+    n_upper = int(upper_mask.sum(axis=1).max(initial=0))
+    n_lower = int(lower_mask.sum(axis=1).max(initial=0))
+
+    info = {
+        "chord": chord,
+        "angle": np.degrees(angle),
+        "te_gap": te_gap,
+        "le_index": le_index,
+        "removed": n_points - counts,
+    }
+    return upper[:, :n_upper], upper_mask[:, :n_upper], lower[:, :n_lower], lower_mask[:, :n_lower], info
+
+
+def normalize_surfaces(
+    upper: np.ndarray, lower: np.ndarray, close_te: bool = False, tol: float = 1e-9
+) -> tuple[np.ndarray, np.ndarray, dict]:
+    """
+    Normalizes one aerofoil, see `normalize_batch`.
+
+    PARAMETERS:
+
+        `upper` -> Upper surface coordinates from the leading edge to the trailing edge. Type(np.ndarray)
+
+        `lower` -> Lower surface coordinates from the leading edge to the trailing edge. Type(np.ndarray)
+
+        `close_te` -> Close the trailing edge gap by shearing each surface linearly with x. Type(bool)
+
+        `tol` -> Distance below which consecutive points are coincident. Type(float)
+
+    RETURNS:
+
+        `upper, lower, info` -> Normalized surfaces, both starting at the leading edge (0, 0), and the chord, angle,
+        te_gap, le_index and removed values of the aerofoil. Type(tuple[np.ndarray, np.ndarray, dict])
+    """
+    upper, upper_mask, lower, lower_mask, info = normalize_batch([(upper, lower)], close_te, tol)
+    info = {key: value[0].item() for key, value in info.items()}
+    return upper[0][upper_mask[0]], lower[0][lower_mask[0]], info
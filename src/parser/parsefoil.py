@@ -13,9 +13,9 @@ __DAT_FILE_PATH: str = (
 )  # aerofoils are stored in this folder
 
 
-def getFormat(filename: str) -> str:
+def dat_path(filename: str) -> str:
     """
-    Returns the order style of the .dat file.
+    Returns the path of an aerofoil .dat file in the aerofoil folder.
 
     PARAMETERS:
 
@@ -23,140 +23,188 @@ def getFormat(filename: str) -> str:
 
     RETURNS:
 
-        `selig` or `lednicer` -> file type. Type(str)
+        `path` -> Path of the .dat file. Type(str)
     """
-    path = __DAT_FILE_PATH + filename
-    with open(path, "r") as f:
-        lines = f.readlines()
-
-    if lines[2] == "\n":
-        return "lednicer"
-    else:
-        return "selig"
+    return __DAT_FILE_PATH + filename
 
 
-def __selig2numpy(filename: str) -> np.ndarray:
+def __read(filename: str) -> list[str]:
     """
-    Parses the coordinates from the .dat file into a numpy array.
+    Reads the lines of an aerofoil .dat file, without line endings.
+    """
+    with open(__DAT_FILE_PATH + filename, "r") as f:
+        return f.read().split("\n")
 
-    PARAMETERS:
 
-        `filename` -> .dat file name. Coordinates in the file must be ordered in selig format. Type(str)
+def __count_header(line: str) -> tuple[int] | None:
+    """
+    Point counts of the upper and lower surfaces from the second line of a lednicer file, None if the line is no such header.
+    """
+    try:
+        n_upper, n_lower = map(float, line.split())
+    except ValueError:
+        return None
+    if n_upper >= 2 and n_lower >= 2 and n_upper.is_integer() and n_lower.is_integer():
+        return int(n_upper), int(n_lower)
+    return None
 
-    RETURNS:
 
-        `coords` -> Array of coordinates in the .dat file. Type(np.ndarray)
+def __parse_lines(lines: list[str]) -> np.ndarray:
+    """
+    Converts the coordinate lines of a .dat file into a (N, 2) array, skipping the lines that are not exactly two numbers.
+    The whole block is converted in one call, the slower line by line conversion only runs for files with other lines.
     """
-    path = __DAT_FILE_PATH + filename
-    with open(path, "r") as f:
-        lines = f.readlines()
+    if any(lines):
+        try:
+            coords = np.loadtxt(lines, comments=None, ndmin=2)
+            if coords.shape[1] == 2:
+                return coords
+        except ValueError:
+            pass
 
     coords = []
-
-    for line in lines[1:]:
+    for line in lines:
         try:
             x, y = map(float, line.strip().split())
             coords.append((x, y))
         except ValueError:
             continue
+    return np.array(coords)
 
-    coords = np.array(coords)
-    return coords
+
+def __parse(lines: list[str]) -> tuple[str, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parses the lines of a .dat file, see `parse_foil`.
+    """
+    # lednicer files have the point counts on the second line, usually followed by a blank line
+    counts = __count_header(lines[1]) if len(lines) > 1 else None
+    if (len(lines) > 2 and lines[2] == "") or counts is not None:
+        coords = __parse_lines(lines[2:])
+        x = coords[:, 0]
+        if counts is not None and sum(counts) == len(coords):
+            mid_index = counts[0] - 1
+        else:
+            mid_index = np.argmax(x)
+        upper = coords[: mid_index + 1].copy()
+        lower = coords[mid_index + 1 :].copy()
+        return "lednicer", coords, upper, lower
+
+    coords = __parse_lines(lines[1:])
+    x = coords[:, 0]
+    mid_index = np.argmin(x)  # Leading edge is at x = 0
+    upper = np.ascontiguousarray(coords[mid_index::-1])
+    lower = coords[mid_index:].copy()
+    return "selig", coords, upper, lower
 
 
-def __lednicer2numpy(filename: str) -> np.ndarray:
+def parse_foil(filename: str) -> tuple[str, np.ndarray, np.ndarray, np.ndarray]:
     """
-    Parses the coordinates from the .dat file into a numpy array.
+    Parses an aerofoil .dat file in a single read: detects its format, converts the coordinates and splits the surfaces.
 
     PARAMETERS:
 
-        `filename` -> .dat file name. Coordinates in the file must be ordered in lednicer format. Type(str)
+        `filename` -> Dat file name. Coordinates in the file must be ordered in either lednicer or selig format. Type(str)
 
     RETURNS:
 
-        `coords` -> Array of coordinates in the .dat file. Type(np.ndarray)
+        `format, coords, upper, lower` -> `selig` or `lednicer`, the coordinates in file order, and the upper and lower
+        surface coordinates from the leading edge to the trailing edge. Type(tuple[str, np.ndarray, np.ndarray, np.ndarray])
     """
+    return __parse(__read(filename))
 
-    path = __DAT_FILE_PATH + filename
-    with open(path, "r") as f:
-        lines = f.readlines()
 
-    coords = []
+def parse_text(text: str) -> tuple[np.ndarray]:
+    """
+    Parses the content of an aerofoil .dat file held in memory and divides the coordinates into upper and lower surface.
 
-    for line in lines[3:]:
-        try:
-            x, y = map(float, line.strip().split())
-            coords.append((x, y))
-        except ValueError:
-            continue
+    PARAMETERS:
 
-    coords = np.array(coords)
-    return coords
+        `text` -> Content of a .dat file. Coordinates must be ordered in either lednicer or selig format. Type(str)
 
+    RETURNS:
 
-def dat2numpy(filename: str) -> np.ndarray:
+        `upper, lower` -> Upper and lower surface coordinates, the same as `split_surfaces` of the file. Type(tuple[np.ndarray])
     """
-    Parses the coordinates from the .dat file into a numpy array.
+    # same lines as reading the file in text mode, which translates the line endings
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    _, _, upper, lower = __parse(text.split("\n"))
+    return upper, lower
+
+
+def parse_bytes(data: bytes, encoding: str = "utf-8") -> tuple[np.ndarray]:
+    """
+    Parses the raw content of an aerofoil .dat file, e.g. a member of an archive, see `parse_text`.
+    Undecodable characters, which can only occur in the name line, are replaced.
 
     PARAMETERS:
 
-        `filename` -> .dat file name. Coordinates in the file must be ordered in either selig or lednicer format. Type(str)
+        `data` -> Content of a .dat file. Type(bytes)
+
+        `encoding` -> Text encoding of the content. Type(str)
 
     RETURNS:
 
-        `__lednicer2numpy(filename)` or `__selig2numpy(filename)` -> Array of coordinates in the .dat file. Type(np.ndarray)
+        `upper, lower` -> Upper and lower surface coordinates. Type(tuple[np.ndarray])
+    """
+    return parse_text(bytes(data).decode(encoding, errors="replace"))
+
+
+def parse_path(source) -> tuple[np.ndarray]:
     """
+    Parses an aerofoil .dat file at any path, or from an open file object, see `parse_text`.
+
+    PARAMETERS:
+
+        `source` -> Path of the .dat file, or a file object opened in text or binary mode. Type(str | os.PathLike | IO)
 
-    if getFormat(filename) == "lednicer":
-        return __lednicer2numpy(filename)
+    RETURNS:
+
+        `upper, lower` -> Upper and lower surface coordinates. Type(tuple[np.ndarray])
+    """
+    if hasattr(source, "read"):
+        content = source.read()
     else:
-        return __selig2numpy(filename)
+        with open(source, "rb") as f:
+            content = f.read()
+    if isinstance(content, str):
+        return parse_text(content)
+    return parse_bytes(content)
 
 
-def __selig_upper_lower(filename) -> tuple[np.ndarray]:
+def getFormat(filename: str) -> str:
     """
-    Parses the coordinates from the .dat file into a numpy array and divides them into upper and lower surface.
+    Returns the order style of the .dat file.
 
     PARAMETERS:
 
-        `filename` -> .dat file name. Coordinates in the file must be ordered in selig format. Type(str)
+        `filename` -> Dat file name. Type(str)
 
     RETURNS:
 
-        `upper, lower` -> Array of coordinates in the .dat file `upper` contains upper surface coordinates and `lower` contains lower surface coordinates. Type(tuple[np.ndarray])
+        `selig` or `lednicer` -> file type. Type(str)
     """
-
-    coords = __selig2numpy(filename)
-    x, y = coords[:, 0], coords[:, 1]
-    mid_index = np.argmin(x)  # Leading edge is at x = 0
-    upper_x, upper_y = x[0 : mid_index + 1], y[: mid_index + 1]
-    lower_x, lower_y = x[mid_index:], y[mid_index:]
-    upper = np.column_stack((np.flip(upper_x), np.flip(upper_y)))
-    lower = np.column_stack((lower_x, lower_y))
-    return upper, lower
+    lines = __read(filename)
+    if (len(lines) > 2 and lines[2] == "") or (
+        len(lines) > 1 and __count_header(lines[1]) is not None
+    ):
+        return "lednicer"
+    else:
+        return "selig"
 
 
-def __lednicer_upper_lower(filename: str) -> tuple[np.ndarray]:
+def dat2numpy(filename: str) -> np.ndarray:
     """
-    Parses the coordinates from the .dat file into a numpy array and divides them into upper and lower surface.
+    Parses the coordinates from the .dat file into a numpy array.
 
     PARAMETERS:
 
-        `filename` -> .dat file name. Coordinates in the file must be ordered in lednicer format. Type(str)
+        `filename` -> .dat file name. Coordinates in the file must be ordered in either selig or lednicer format. Type(str)
 
     RETURNS:
 
-        `upper, lower` -> Array of coordinates in the .dat file `upper` contains upper surface coordinates and `lower` contains lower surface coordinates. Type(tuple[np.ndarray])
+        `coords` -> Array of coordinates in the .dat file. Type(np.ndarray)
     """
-
-    coords = __lednicer2numpy(filename)
-    x, y = coords[:, 0], coords[:, 1]
-    mid_index = np.argmax(x)
-    upper_x, upper_y = x[: mid_index + 1], y[: mid_index + 1]
-    lower_x, lower_y = x[mid_index + 1 :], y[mid_index + 1 :]
-    upper = np.column_stack((upper_x, upper_y))
-    lower = np.column_stack((lower_x, lower_y))
-    return upper, lower
+    return parse_foil(filename)[1]
 
 
 def split_surfaces(filename: str) -> tuple[np.ndarray]:
@@ -169,10 +217,7 @@ def split_surfaces(filename: str) -> tuple[np.ndarray]:
 
     RETURNS:
 
-        `__lednicer_upper_lower(filename)` or `__selig_upper_lower(filename)` -> Array of coordinates in the .dat file `upper` contains upper surface coordinates and `lower` contains lower surface coordinates. Type(tuple[np.ndarray])
+        `upper, lower` -> Array of coordinates in the .dat file `upper` contains upper surface coordinates and `lower` contains lower surface coordinates. Type(tuple[np.ndarray])
     """
-
-    if getFormat(filename) == "lednicer":
-        return __lednicer_upper_lower(filename)
-    else:
-        return __selig_upper_lower(filename)
+    _, _, upper, lower = parse_foil(filename)
+    return upper, lower
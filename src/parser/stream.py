@@ -0,0 +1,145 @@
+"""
+parser.stream
+=============
+
+Concurrent streaming of the aerofoils of a whole folder. The files are read and parsed on a thread pool
+a bounded number of files ahead of the consumer, overlapping the disk reads and parsing with the downstream work.
+"""
+
+import glob
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, TypedDict
+import numpy as np
+from parser.normalize import normalize_surfaces
+from parser.parsefoil import parse_path
+
+
+class LoadError(TypedDict):
+    """
+    Record of a .dat file that could not be loaded and was skipped.
+
+    ATTRIBUTES
+
+        `name` -> File name. Type(str)
+
+        `path` -> Path of the file. Type(str)
+
+        `error` -> Name of the exception type. Type(str)
+
+        `message` -> Description of the problem. Type(str)
+    """
+
+    name: str
+    path: str
+    error: str
+    message: str
+
+
+def __paths(source: str | Iterable[str], pattern: str) -> list[str]:
+    """
+    Paths of the files to load: the files of a folder matching `pattern`, the matches of a glob pattern, or the given paths.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return [os.fspath(path) for path in source]
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, pattern)))
+    return sorted(glob.glob(source, recursive=True))
+
+
+def load_foil(path: str, normalize: bool = False) -> tuple[str, np.ndarray, np.ndarray] | LoadError:
+    """
+    Loads one aerofoil file, returning an error record instead of raising for malformed or unreadable files.
+
+    PARAMETERS:
+
+        `path` -> Path of the .dat file. Type(str)
+
+        `normalize` -> Normalize the geometry with `parser.normalize.normalize_surfaces`. Type(bool)
+
+    RETURNS:
+
+        `name, upper, lower` -> File name and the surface coordinates, or a `LoadError`. Type(tuple | LoadError)
+    """
+    name = os.path.basename(path)
+    try:
+        upper, lower = parse_path(path)
+        if len(upper) < 2 or len(lower) < 2:
+            raise ValueError("too few coordinates for an upper and a lower surface")
+        if normalize:
+            upper, lower, _ = normalize_surfaces(upper, lower)
+    except IndexError as e:  # the parser found no coordinate block
+        return LoadError(name=name, path=path, error=type(e).__name__, message="no coordinates found")
+    except (OSError, ValueError) as e:
+        return LoadError(name=name, path=path, error=type(e).__name__, message=str(e))
+    return name, upper, lower
+
+
+def iter_foils(
+    source: str | Iterable[str],
+    pattern: str = "*.dat",
+    workers: int = 4,
+    prefetch: int | None = None,
+    ordered: bool = True,
+    errors: list | None = None,
+    normalize: bool = False,
+) -> Iterator[tuple[str, np.ndarray, np.ndarray]]:
+    """
+    Streams the aerofoils of a folder, a glob pattern or a list of paths, loading them on a thread pool.
+    Files that cannot be loaded are skipped and recorded in `errors`.
+
+    PARAMETERS:
+
+        `source` -> Folder, glob pattern (e.g. "UIUC_aerofoils/naca*.dat") or paths of .dat files. Type(str | Iterable[str])
+
+        `pattern` -> File name pattern of the files of a folder. Type(str)
+
+        `workers` -> Number of loading threads. Type(int)
+
+        `prefetch` -> Largest number of files loaded ahead of the consumer, defaults to twice the number of workers. Type(int)
+
+        `ordered` -> Yield in the order of the paths (sorted for folders and patterns), else as soon as a file is loaded. Type(bool)
+
+        `errors` -> List the `LoadError` records of skipped files are appended to. Type(list)
+
+        `normalize` -> Normalize the geometry of every aerofoil on the loading threads, see `parser.normalize`. Type(bool)
+
+    RETURNS:
+
+        Generator of (name, upper, lower) tuples.
+    """
+    paths = iter(__paths(source, pattern))
+    prefetch = max(prefetch or 2 * workers, 1)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    def fill() -> None:
+        while len(pending) < prefetch:
+            path = next(paths, None)
+            if path is None:
+                return
+            pending.append(executor.submit(load_foil, path, normalize))
+
+    try:
+        fill()
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(f for f in pending if f in done)
+                pending.remove(future)
+            result = future.result()
+            fill()
+
+            if isinstance(result, dict):
+                if errors is not None:
+                    errors.append(result)
+                continue
+            yield result
+    finally:
+        # also reached when the consumer stops early: queued loads are cancelled,
+        # and the loads already running are waited for so no thread outlives the generator
+        executor.shutdown(wait=True, cancel_futures=True)
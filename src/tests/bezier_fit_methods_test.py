@@ -0,0 +1,30 @@
+if __name__ == "__main__":
+    from database.UIUC_aerofoils import UIUC_DATABASE as UDB
+    import parser.parsefoil as aeroparse
+    import bezier.spline as bsp
+    import numpy as np
+    import time
+
+    upper, lower = aeroparse.split_surfaces(UDB["a18_dat"])
+
+    for method, parametrization in [
+        ("L-BFGS-B", "uniform"),
+        ("lstsq", "uniform"),
+        ("lstsq", "chord_length"),
+        ("lstsq", "centripetal"),
+        ("global", "chord_length"),
+    ]:
+        start = time.time()
+        upper_control = bsp.get_control_tensor(upper, 5, method, parametrization)
+        exec_time = time.time() - start
+
+        upper_bezier = bsp.bezier_spline(upper_control, 30)
+        print(
+            f"{method:>8} {parametrization:>12} -> {exec_time:.5f} seconds, "
+            f"max |y| {np.max(np.abs(upper_bezier[:, 1])):.5f} "
+            f"(data {np.max(np.abs(upper[:, 1])):.5f})"
+        )
+
+    for continuity in (0, 1, 2):
+        _, residual = bsp.fit_global_control_tensor(upper, 5, continuity, "chord_length")
+        print(f"Global fit with C{continuity} continuity -> residual {residual:.6f}")
@@ -0,0 +1,30 @@
+if __name__ == "__main__":
+    from database.UIUC_aerofoils import UIUC_DATABASE as UDB
+    from classes.bezierfoilbatch import BezierFoilBatch
+    import parser.parsefoil as aeroparse
+    import bezier.spline as bsp
+    import numpy as np
+    import time
+
+    names = [UDB["a18_dat"], UDB["naca0015_dat"], UDB["e387_dat"], UDB["clarky_dat"]]
+    upper_controls, lower_controls = [], []
+    for name in names:
+        upper, lower = aeroparse.split_surfaces(name)
+        upper_control, lower_control = bsp.get_control_tensors(
+            [upper, lower], 10, "lstsq"
+        )
+        upper_controls.append(upper_control)
+        lower_controls.append(lower_control)
+
+    batch = BezierFoilBatch(np.stack(upper_controls), np.stack(lower_controls), names)
+    big_batch = BezierFoilBatch.from_vectors(np.tile(batch.to_vectors(), (2500, 1)), 10)
+
+    start = time.time()
+    curves = big_batch.selig_coords(10)
+    exec_time = time.time() - start
+    print(f"{len(big_batch)} aerofoils -> curves of shape {curves.shape} in {exec_time} seconds")
+
+    print(batch[1:3].names, batch[0].upper_control.shape)
+    print(np.allclose(batch.getUpperCurves(10)[2], bsp.bezier_spline(upper_controls[2], 10)))
+
+    batch.save_foils("Foil", points_per_seg=10, write_precision=8)
@@ -0,0 +1,23 @@
+if __name__ == "__main__":
+    from database.UIUC_aerofoils import UIUC_DATABASE as UDB
+    from classes.bezierfoil import BezierFoil
+    from bezier.spline import enforce_continuity
+    import numpy as np
+
+    TEST_FOIL = BezierFoil(UDB['a18_dat'], 10, method="lstsq")
+    coeff_matrix = np.random.default_rng(0).normal(scale=0.5, size=(20, 10))
+
+    # every row of the batch is the shape perturb_pca gives a copy of the aerofoil
+    shapes = TEST_FOIL.perturb_pca_batch(coeff_matrix)
+    singles = []
+    for coefficients in coeff_matrix:
+        foil = BezierFoil.from_controls(TEST_FOIL.upper_control.copy(), TEST_FOIL.lower_control.copy())
+        foil.perturb_pca(coefficients)
+        singles.append(np.concatenate([foil.upper_control.flatten(), foil.lower_control.flatten()]))
+    print("batch == single:", np.allclose(shapes, np.array(singles), rtol=0, atol=1e-12))
+
+    # with continuity the returned control tensors are left continuous
+    shapes = TEST_FOIL.perturb_pca_batch(coeff_matrix, continuity=True)
+    split_idx = TEST_FOIL.upper_control.size
+    lower = shapes[:, split_idx:].reshape(len(shapes), *TEST_FOIL.lower_control.shape)
+    print("continuous lower surfaces:", np.allclose(enforce_continuity(lower.copy()), lower))
@@ -0,0 +1,44 @@
+if __name__ == "__main__":
+    import os
+    import subprocess
+    import time
+    from database.UIUC_aerofoils import UIUC_DATABASE as UDB
+    from parser.parsefoil import dat_path
+    from xfoil.fake_xfoil import FAKE_XFOIL
+    from xfoil.session import XfoilSession, XfoilPool
+
+    FOIL_PATH = dat_path(UDB["a18_dat"])
+    SETTINGS = dict(
+        cadd_adj_no=1,
+        angle_thresh=10,
+        n_pts=250,
+        reynolds=6e6,
+        ncrit=10,
+        niter=1000,
+        alfa=0,
+    )
+    # Swap FAKE_XFOIL for "xfoil" to benchmark the real executable
+    EXECUTABLE = FAKE_XFOIL
+
+    start = time.time()
+    for i in range(10):
+        process = subprocess.Popen(
+            EXECUTABLE,
+            stdout=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        process.communicate("QUIT\n")
+    print(f"10 XFOIL PROCESS START-UPS TAKE {time.time() - start} seconds")
+
+    with XfoilSession(EXECUTABLE) as session:
+        start = time.time()
+        for i in range(10):
+            result = session.run(FOIL_PATH, **SETTINGS)
+        print(f"10 XFOIL SESSION ANALYSES TAKE {time.time() - start} seconds -> {result}")
+
+    with XfoilPool(os.cpu_count(), EXECUTABLE) as pool:
+        start = time.time()
+        results = pool.map([FOIL_PATH] * 100, **SETTINGS)
+        print(f"100 XFOIL POOL ANALYSES TAKE {time.time() - start} seconds")
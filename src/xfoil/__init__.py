@@ -0,0 +1,16 @@
+"""
+xfoil
+=====
+
+Module to run aerodynamic analyses of aerofoils with the XFOIL 6.99 application.
+
+Contains 7 sub-modules:
+
+1. `analysis` containing the blocking and asyncio python wrappers which run a single XFOIL analysis or angle of attack sweep per process.
+2. `session` containing long-lived XFOIL processes and a pool of them to stream many analyses.
+3. `parallel` containing an executor running many isolated single-process analyses at the same time.
+4. `cache` containing a persistent SQLite cache of analysis results keyed by geometry and settings.
+5. `stats` containing running run time statistics per settings profile and the adaptive timeouts derived from them.
+6. `metrics` containing optional per-phase timers and event counters of the analysis wrappers.
+7. `fake_xfoil` containing a stand-in XFOIL executable speaking the same command protocol, for tests and benchmarks.
+"""
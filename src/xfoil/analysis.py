@@ -5,11 +5,498 @@ xfoil.analysis
 Python wrapper on XFOIL 6.99 application to perform aerodynamic analysis on aerofoils
 """
 
+import asyncio
+import io
 import os
+import re
+import shutil
 import subprocess
+import tempfile
+import time
+from typing import TypedDict
+import numpy as np
+from xfoil.cache import MISSING, XfoilCache
+from xfoil.metrics import METRICS
+from xfoil.stats import RUNTIME_STATS
+
+
+def read_polar(path: str) -> np.ndarray:
+    """
+    Reads the operating points of an XFOIL polar save file (PACC).
+
+    PARAMETERS:
+
+        `path` -> Path of the polar file. Type(str)
+
+    RETURNS:
+
+        `polar` -> One row per converged operating point with the columns
+        alpha, CL, CD, CDp, CM, Top_Xtr, Bot_Xtr (and any further columns XFOIL writes). Type(np.ndarray)
+    """
+    with open(path, "r") as f:
+        text = f.read()
+
+    # the operating points follow the dashed line under the column names
+    separator = text.find("\n -")
+    if separator == -1:
+        return np.empty((0, 7))
+    body = text[text.find("\n", separator + 1) + 1 :]
+    if not body.strip():
+        return np.empty((0, 7))
+    return np.loadtxt(io.StringIO(body), ndmin=2)
+
+
+DUMP_DTYPE = np.dtype(
+    [
+        ("s", float),
+        ("x", float),
+        ("y", float),
+        ("Ue", float),
+        ("Dstar", float),
+        ("Theta", float),
+        ("Cf", float),
+        ("H", float),
+    ]
+)
+"""
+Structured array type of the boundary layer distributions returned by `read_dump`.
+"""
+
+CP_DTYPE = np.dtype([("x", float), ("y", float), ("Cp", float)])
+"""
+Structured array type of the pressure distributions returned by `read_cp`.
+"""
+
+__FORTRAN_OVERFLOW = re.compile(r"\*+")
+
+
+def read_dump(path: str) -> np.ndarray:
+    """
+    Reads the boundary layer distributions of an XFOIL DUMP file, surface points followed by the wake points.
+    Only the first 8 columns are read, as wake rows carry fewer columns than the surface rows,
+    and fields XFOIL could not format (asterisks) become NaN.
+
+    PARAMETERS:
+
+        `path` -> Path of the dump file. Type(str)
+
+    RETURNS:
+
+        `dump` -> One row per point with the fields s, x, y, Ue, Dstar, Theta, Cf and H, see `DUMP_DTYPE`. Type(np.ndarray)
+    """
+    with open(path, "r") as f:
+        text = __FORTRAN_OVERFLOW.sub(" nan ", f.read())
+
+    n_fields = len(DUMP_DTYPE)
+    rows = [line.split()[:n_fields] for line in text.splitlines()]
+    rows = [row for row in rows if len(row) == n_fields and not row[0].startswith("#")]
+    values = np.array(rows, dtype=float).reshape(-1, n_fields)
+    return values.view(DUMP_DTYPE).reshape(-1)  # the rows are contiguous float64 records
+
+
+def read_cp(path: str) -> np.ndarray:
+    """
+    Reads the pressure distribution of an XFOIL CPWR file, written with (x, y, Cp) or, by older versions, (x, Cp) columns.
+
+    PARAMETERS:
+
+        `path` -> Path of the Cp file. Type(str)
+
+    RETURNS:
+
+        `cp` -> One row per panel node with the fields x, y and Cp, see `CP_DTYPE`.
+        y is NaN for files without y column. Type(np.ndarray)
+    """
+    values = np.loadtxt(path, comments="#", ndmin=2)
+    cp = np.empty(len(values), dtype=CP_DTYPE)
+    cp["x"] = values[:, 0]
+    cp["y"] = values[:, 1] if values.shape[1] > 2 else np.nan
+    cp["Cp"] = values[:, -1]
+    return cp
+
+
+def xfoil_commands(
+    foil_path: str,
+    polar_path: str,
+    dump_path: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    operating_points: str,
+    visc: bool = True,
+) -> str:
+    """
+    XFOIL commands analysing one aerofoil: loading and repaneling it, setting up the viscous solver
+    and computing the operating points into a polar file. They start at the top level menu of XFOIL
+    and end in the OPER menu with polar accumulation still on.
+
+    PARAMETERS:
+
+        `foil_path` -> Aerofoil file loaded by XFOIL. Type(str)
+
+        `polar_path` -> Polar file the operating points are accumulated in. Type(str)
+
+        `dump_path` -> Polar dump file, an empty string for none. Type(str)
+
+        `operating_points` -> OPER commands computing the operating points, e.g. "ALFA 2". Type(str)
+
+        `visc` -> Switch viscous mode on with VISC, else only set the Reynolds number with RE,
+        for XFOIL processes already in viscous mode as VISC toggles it. Type(bool)
+
+        (rest same as `aero_analysis`)
+
+    RETURNS:
+
+        `commands` -> Lines to write to XFOIL's stdin. Type(str)
+    """
+    viscous = f"VISC\n{reynolds}" if visc else f"RE {reynolds}"
+    return (
+        f"LOAD {foil_path}\n"
+        f"GDES CADD {cadd_adj_no} {angle_thresh} 0.0 1.0\n"
+        "\n"
+        "PCOP\n"
+        f"PPAR n {n_pts}\n"
+        "\n"
+        "OPER\n"
+        f"{viscous}\n"
+        "VPAR\n"
+        f"N {ncrit}\n"
+        "\n"
+        f"ITER {niter}\n"
+        "PACC\n"
+        f"{polar_path}\n"
+        f"{dump_path}\n"
+        f"{operating_points}\n"
+    )
 
 
 def __gen_xfoil_commands(
+    foil_path: str,
+    polar_path: str,
+    dump_path: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    operating_points: str,
+):
+    commands = xfoil_commands(
+        foil_path,
+        polar_path,
+        dump_path,
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        operating_points,
+    )
+    return commands + "\nQUIT\n"
+
+
+def make_job_dir(scratch_dir: str | None = None, use_tmpfs: bool = False) -> str:
+    """
+    Creates a private working folder for one XFOIL run, so concurrent runs never share input or output files.
+    The folder names are short because XFOIL truncates long file paths.
+
+    PARAMETERS:
+
+        `scratch_dir` -> Folder in which the job folder is created, defaults to the system temporary folder. Type(str)
+
+        `use_tmpfs` -> Create the job folder in the RAM backed /dev/shm when it exists and no scratch_dir is given. Type(bool)
+
+    RETURNS:
+
+        `job_dir` -> Path of the new, empty job folder. Type(str)
+    """
+    if scratch_dir is None and use_tmpfs and os.path.isdir("/dev/shm"):
+        scratch_dir = "/dev/shm"
+    return tempfile.mkdtemp(prefix="xfoil_", dir=scratch_dir)
+
+
+def __foil_path(folder: str, foil_dat_file: str) -> str:
+    filepath = os.path.join(os.getcwd(), folder, foil_dat_file)
+    if not os.path.isfile(filepath):
+        raise FileNotFoundError(
+            f"Aerofoil file '{foil_dat_file}' not found in '{folder}'"
+        )
+    return filepath
+
+
+def __prepare_job(
+    filepath: str,
+    job_dir: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    operating_points: str,
+) -> tuple[str, str]:
+    """
+    Copies the aerofoil into the job folder. Returns the XFOIL commands of the job and the path of its polar file.
+    XFOIL runs in the job folder, so the commands name the files relative to it: XFOIL truncates long file names,
+    which a deep scratch folder would exceed.
+    """
+    shutil.copyfile(filepath, os.path.join(job_dir, "foil.dat"))
+
+    command = __gen_xfoil_commands(
+        "foil.dat",
+        "Data.dat",
+        "Dump.dat",
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        operating_points,
+    )
+    return command, os.path.join(job_dir, "Data.dat")
+
+
+def __profile(
+    n_pts: int, reynolds: float, ncrit: int, niter: int, operating_points: str
+) -> tuple:
+    """
+    Settings profile of a job for the run time statistics, with the number of operating points it computes.
+    """
+    n_points = 0
+    for line in operating_points.splitlines():
+        words = line.split()
+        if len(words) >= 4 and words[0].upper().endswith("SEQ"):
+            start, stop, step = map(float, words[1:4])
+            n_points += int((stop - start) / step + 0.5) + 1 if step else 1
+        elif words:
+            n_points += 1
+    return n_pts, reynolds, ncrit, niter, n_points
+
+
+def __distribution_commands(operating_points: str, distributions: bool) -> str:
+    """
+    Appends the commands writing the boundary layer and pressure distributions of the last operating point.
+    XFOIL runs in the job folder, so the files are named relative to it.
+    """
+    if not distributions:
+        return operating_points
+    return f"{operating_points}\nDUMP bl.dat\nCPWR cp.dat"
+
+
+def __collect_job(
+    data_path: str, foil_dat_file: str, status: str, distributions: bool = False
+) -> tuple[np.ndarray | None, str, dict | None]:
+    """
+    Reads the polar a finished job accumulated, and its distributions when requested, see `__run_xfoil`.
+    A job whose XFOIL exited with an error ("crash") is only a crash if it produced no polar rows.
+    """
+    # Check if XFoil produced a valid output
+    if not os.path.isfile(data_path):
+        if status == "ok":
+            print(f"XFoil failed to generate results for {foil_dat_file}. Skipping.")
+        elif status == "crash":
+            print(f"XFoil crashed for {foil_dat_file}.")
+        return None, "no_output" if status == "ok" else status, None
+
+    try:
+        polar = read_polar(data_path)
+    except Exception as e:
+        print(f"Error reading results for {foil_dat_file}: {e}")
+        return None, "read_error", None
+
+    if status == "crash":
+        if len(polar) == 0:
+            print(f"XFoil crashed for {foil_dat_file}.")
+            return polar, status, None
+        status = "ok"  # e.g. XFOIL failing on exit after writing the polar
+
+    fields = None
+    if distributions and status == "ok":
+        job_dir = os.path.dirname(data_path)
+        try:
+            fields = {
+                "bl": read_dump(os.path.join(job_dir, "bl.dat")),
+                "cp": read_cp(os.path.join(job_dir, "cp.dat")),
+            }
+        except (OSError, ValueError) as e:
+            print(f"Error reading distributions for {foil_dat_file}: {e}")
+    return polar, status, fields
+
+
+def __open_job(
+    filepath: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    operating_points: str,
+    timeout: float | str,
+    scratch_dir: str | None,
+    use_tmpfs: bool,
+    distributions: bool,
+) -> tuple[str, str, str, tuple, float]:
+    """
+    Creates the job folder of a run and writes its input. Returns the job folder, the XFOIL commands,
+    the path of the polar file, the settings profile and the resolved timeout of the run.
+    """
+    METRICS.count("calls")
+    job_dir = make_job_dir(scratch_dir, use_tmpfs)
+    try:
+        with METRICS.phase("write"):
+            command, data_path = __prepare_job(
+                filepath,
+                job_dir,
+                cadd_adj_no,
+                angle_thresh,
+                n_pts,
+                reynolds,
+                ncrit,
+                niter,
+                __distribution_commands(operating_points, distributions),
+            )
+    except BaseException:
+        __close_job(job_dir)
+        raise
+    profile = __profile(n_pts, reynolds, ncrit, niter, operating_points)
+    if timeout == "auto":
+        timeout = RUNTIME_STATS.timeout(profile)
+    return job_dir, command, data_path, profile, timeout
+
+
+def __finish_job(
+    data_path: str,
+    foil_dat_file: str,
+    status: str,
+    profile: tuple,
+    seconds: float,
+    distributions: bool,
+) -> tuple[np.ndarray | None, str, dict | None]:
+    """
+    Records the run time of a finished run and reads its results, see `__collect_job`.
+    """
+    RUNTIME_STATS.record(profile, seconds, status)
+    with METRICS.phase("read"):
+        polar, status, fields = __collect_job(data_path, foil_dat_file, status, distributions)
+    if status != "ok":
+        METRICS.count("failures")
+        METRICS.count(status)
+    return polar, status, fields
+
+
+def __close_job(job_dir: str) -> None:
+    with METRICS.phase("cleanup"):
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def __run_xfoil(
+    folder: str,
+    foil_dat_file: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    operating_points: str,
+    timeout: float | str,
+    executable: str | list[str],
+    scratch_dir: str | None,
+    use_tmpfs: bool,
+    distributions: bool = False,
+) -> tuple[np.ndarray | None, str, dict | None]:
+    """
+    Runs one XFOIL process on an aerofoil in its own temporary job folder and reads the polar it accumulated.
+
+    PARAMETERS:
+
+        `operating_points` -> OPER commands computing the operating points, e.g. "ALFA 2". Type(str)
+
+        `distributions` -> Also read the boundary layer and pressure distributions of the last operating point. Type(bool)
+
+        `timeout` -> Time limit in seconds, or "auto" for the limit derived from `RUNTIME_STATS`.
+        The run time of every job is recorded there. Type(float | str)
+
+        (rest same as `aero_analysis`)
+
+    RETURNS:
+
+        `polar, status, distributions` -> Polar rows (see `read_polar`), possibly partial, "ok", "timeout",
+        "crash", "no_output" or "read_error", and the distributions or None. Type(tuple[np.ndarray, str, dict])
+    """
+    job_dir, command, data_path, profile, timeout = __open_job(
+        __foil_path(folder, foil_dat_file),
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        operating_points,
+        timeout,
+        scratch_dir,
+        use_tmpfs,
+        distributions,
+    )
+    try:
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            with METRICS.phase("spawn"):
+                process = subprocess.Popen(
+                    [executable] if isinstance(executable, str) else list(executable),
+                    stdout=subprocess.PIPE,
+                    stdin=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    cwd=job_dir,
+                )
+            with METRICS.phase("solve"):
+                process.communicate(command, timeout=timeout)  # ⏳ Enforce timeout
+                process.wait()
+            if process.returncode != 0:
+                status = "crash"  # unless it wrote polar rows, see `__collect_job`
+
+        except subprocess.TimeoutExpired:
+            print(f"XFoil timed out for {foil_dat_file}. Skipping.")
+            process.kill()
+            process.communicate()
+            status = "timeout"
+        return __finish_job(
+            data_path,
+            foil_dat_file,
+            status,
+            profile,
+            time.perf_counter() - start,
+            distributions,
+        )
+    finally:
+        __close_job(job_dir)
+
+
+def __single_point(polar: np.ndarray | None, status: str):
+    """
+    (cl, cd, cl/cd) of the last operating point of a single point job, None if there is none.
+    """
+    if status != "ok":
+        return None
+    if len(polar) == 0:
+        METRICS.count("not_converged")
+        return None  # If no valid data is found
+    cl = float(polar[-1, 1])
+    cd = float(polar[-1, 2])
+    return cl, cd, cl / cd
+
+
+def __cache_lookup(
+    cache: XfoilCache | None,
     folder: str,
     foil_dat_file: str,
     cadd_adj_no: int,
@@ -19,28 +506,50 @@ def __gen_xfoil_commands(
     ncrit: int,
     niter: int,
     alfa: float,
-):
+    executable: str | list[str],
+) -> tuple[str | None, object]:
+    """
+    Cache key of a single point analysis and its cached result, (None, MISSING) without a cache
+    or for files the parser cannot read, which are left to XFOIL.
+    """
+    if cache is None:
+        return None, MISSING
+    try:
+        key = cache.key_file(
+            __foil_path(folder, foil_dat_file),
+            cadd_adj_no,
+            angle_thresh,
+            n_pts,
+            reynolds,
+            ncrit,
+            niter,
+            alfa,
+            executable,
+        )
+    except (IndexError, ValueError):  # no coordinate block, see `parser.parsefoil`
+        return None, MISSING
+    result = cache.get(key)
+    METRICS.count("cache_misses" if result is MISSING else "cache_hits")
+    return key, result
 
-    return f"""
-    LOAD {folder}/{foil_dat_file}
-    GDES CADD {cadd_adj_no} {angle_thresh} 0.0 1.0
-    \n
-    PCOP
-    PPAR n {n_pts}
-    \n
-    OPER
-    VISC
-    {reynolds}
-    VPAR
-    N {ncrit} \n
-    ITER {niter}
-    PACC
-    {folder}/Data.dat
-    {folder}/Dump.dat
-    ALFA {alfa}
-    \n
-    QUIT
+
+def __analysis_result(
+    polar: np.ndarray | None,
+    status: str,
+    fields: dict | None,
+    distributions: bool,
+    cache: XfoilCache | None,
+    key: str | None,
+):
+    """
+    Result of a single point analysis, see `aero_analysis`, stored in the cache if there is one.
     """
+    result = __single_point(polar, status)
+    if distributions and result is not None:
+        return *result, fields
+    if key is not None:
+        cache.put(key, result, status)
+    return result
 
 
 def aero_analysis(
@@ -53,31 +562,181 @@ def aero_analysis(
     ncrit: int,
     niter: int,
     alfa: float,
-    timeout: int = 5,  # ⏳ Added timeout parameter
+    timeout: int | str = 5,  # ⏳ Added timeout parameter
+    executable: str | list[str] = "xfoil.exe",
+    scratch_dir: str | None = None,
+    use_tmpfs: bool = False,
+    cache: XfoilCache | None = None,
+    return_distributions: bool = False,
 ):
     """
     Runs XFoil analysis with a timeout to handle cases where it freezes.
     If XFoil fails, the function returns None.
+    Every run works in its own temporary folder which is removed afterwards,
+    so several analyses can run at the same time.
 
     PARAMETERS:
-        (same as before)
+        `timeout` -> Time limit in seconds, or "auto" to derive it from the run times of earlier analyses
+        with the same settings, see `xfoil.stats.RUNTIME_STATS`. Type(int | str)
+
+        `executable` -> XFOIL executable, or a full command line such as `fake_xfoil.FAKE_XFOIL`. Type(str | list[str])
+
+        `scratch_dir` -> Folder for the temporary job folders, defaults to the system temporary folder. Type(str)
+
+        `use_tmpfs` -> Keep the job folder in the RAM backed /dev/shm when available. Type(bool)
+
+        `cache` -> Result cache looked up before running XFOIL and updated afterwards.
+        Only converged and not converged analyses are stored, crashed or timed out runs are repeated next time. Type(XfoilCache)
+
+        `return_distributions` -> Also return the boundary layer (`read_dump`) and pressure (`read_cp`) distributions,
+        written by the DUMP and CPWR commands. The cache only holds coefficients, so it is not used then. Type(bool)
+
+        (rest same as before)
 
     RETURNS:
         Tuple (cl, cd, cl/cd) if successful, else None.
+        With `return_distributions` the tuple is (cl, cd, cl/cd, {"bl": dump, "cp": cp}),
+        the dictionary being None if XFOIL did not write the distributions.
     """
-    filepath = os.path.join(os.getcwd(), folder, foil_dat_file)
-    if not os.path.isfile(filepath):
-        raise FileNotFoundError(
-            f"Aerofoil file '{foil_dat_file}' not found in '{folder}'"
-        )
+    if return_distributions:
+        cache = None  # the cache only holds coefficients
+    key, result = __cache_lookup(
+        cache,
+        folder,
+        foil_dat_file,
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        alfa,
+        executable,
+    )
+    if result is not MISSING:
+        return result
 
-    # Remove old XFoil output files if they exist
-    for filename in ["Data.dat", "Dump.dat"]:
-        path = os.path.join(os.getcwd(), folder, filename)
-        if os.path.isfile(path):
-            os.remove(path)
+    polar, status, fields = __run_xfoil(
+        folder,
+        foil_dat_file,
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        f"ALFA {alfa}",
+        timeout,
+        executable,
+        scratch_dir,
+        use_tmpfs,
+        return_distributions,
+    )
+    return __analysis_result(polar, status, fields, return_distributions, cache, key)
 
-    command = __gen_xfoil_commands(
+
+POLAR_DTYPE = np.dtype(
+    [
+        ("alpha", float),
+        ("CL", float),
+        ("CD", float),
+        ("CDp", float),
+        ("CM", float),
+        ("Top_Xtr", float),
+        ("Bot_Xtr", float),
+        ("converged", bool),
+    ]
+)
+"""
+Structured array type of the polars returned by `aero_polar`.
+"""
+
+
+def __sweep(values, single: str = "ALFA", sequence: str = "ASEQ") -> tuple[np.ndarray, str]:
+    """
+    Requested operating points and the OPER commands computing them.
+    A (start, stop, step) tuple becomes a single `sequence` command (ASEQ, CSEQ), any other sequence
+    chained `single` commands (ALFA, CL).
+    """
+    if isinstance(values, tuple) and len(values) == 3:
+        start, stop, step = values
+        # same number of points as XFOIL's ASEQ and CSEQ
+        n_points = int((stop - start) / step + 0.5) + 1
+        return start + step * np.arange(n_points), f"{sequence} {start} {stop} {step}"
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    return values, "\n".join(f"{single} {value}" for value in values)
+
+
+def __polar_table(
+    requested: np.ndarray, polar: np.ndarray | None, column: str = "alpha"
+) -> np.ndarray:
+    """
+    Lines up the converged polar rows with the requested operating points, matched on the alpha or the CL column.
+    Rows of points that did not converge are NaN with `converged` False, except for the requested values.
+    """
+    table = np.zeros(len(requested), dtype=POLAR_DTYPE)
+    for name in POLAR_DTYPE.names[:-1]:
+        table[name] = np.nan
+    table[column] = requested
+    if polar is None or len(polar) == 0:
+        return table
+
+    # XFOIL writes alpha with 3 and CL with 4 decimals
+    j = POLAR_DTYPE.names.index(column)
+    matches = np.abs(polar[:, j][None, :] - np.asarray(requested, dtype=float)[:, None]) < 5e-4
+    for i in np.flatnonzero(matches.any(axis=1)):
+        row = polar[np.flatnonzero(matches[i])[-1]]  # latest solution of a repeated point
+        for k, name in enumerate(POLAR_DTYPE.names[:-1]):
+            table[name][i] = row[k]
+        table["converged"][i] = True
+    return table
+
+
+def aero_polar(
+    folder: str,
+    foil_dat_file: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    alphas=None,
+    timeout: int | str = 30,
+    executable: str | list[str] = "xfoil.exe",
+    scratch_dir: str | None = None,
+    use_tmpfs: bool = False,
+    target_cl=None,
+) -> np.ndarray | None:
+    """
+    Runs an XFoil angle of attack or lift coefficient sweep in a single XFOIL process.
+    Every viscous solution is warm started from the previous point.
+    If XFoil produces no results at all, the function returns None.
+
+    PARAMETERS:
+        `alphas` -> (start, stop, step) tuple run as one ASEQ, or a sequence of angles run as chained ALFA commands. Type(tuple | list | np.ndarray)
+
+        `target_cl` -> Instead of `alphas`, lift coefficients to solve the angle of attack for:
+        a (start, stop, step) tuple run as one CSEQ, or a sequence run as chained CL commands. Type(tuple | list | np.ndarray)
+
+        `timeout` -> Time limit of the whole sweep in seconds, or "auto". Points finished before a timeout are still returned. Type(int | str)
+
+        (rest same as `aero_analysis`)
+
+    RETURNS:
+        Structured array of `POLAR_DTYPE`, one row per requested angle or lift coefficient with
+        alpha, CL, CD, CDp, CM, Top_Xtr, Bot_Xtr and the convergence flag.
+    """
+    if (alphas is None) == (target_cl is None):
+        raise ValueError("aero_polar needs exactly one of alphas and target_cl")
+    if target_cl is None:
+        column = "alpha"
+        requested, operating_points = __sweep(alphas)
+    else:
+        column = "CL"
+        requested, operating_points = __sweep(target_cl, "CL", "CSEQ")
+
+    polar, status, _ = __run_xfoil(
         folder,
         foil_dat_file,
         cadd_adj_no,
@@ -86,41 +745,350 @@ def aero_analysis(
         reynolds,
         ncrit,
         niter,
-        alfa,
+        operating_points,
+        timeout,
+        executable,
+        scratch_dir,
+        use_tmpfs,
+    )
+    if polar is None:
+        return None
+    return __polar_table(requested, polar, column)
+
+
+def aero_target_cl(
+    folder: str,
+    foil_dat_file: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    target_cl: float,
+    timeout: int | str = 5,
+    executable: str | list[str] = "xfoil.exe",
+    scratch_dir: str | None = None,
+    use_tmpfs: bool = False,
+):
+    """
+    Runs XFoil analysis at a specified lift coefficient with the CL command,
+    solving for the angle of attack in the same run instead of searching for it over many runs.
+    If XFoil fails or does not converge, the function returns None.
+
+    PARAMETERS:
+        `target_cl` -> Lift coefficient to solve the angle of attack for. Type(float)
+
+        (rest same as `aero_analysis`)
+
+    RETURNS:
+        Tuple (alpha, cl, cd, cm) if successful, else None.
+    """
+    polar, status, _ = __run_xfoil(
+        folder,
+        foil_dat_file,
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        f"CL {target_cl}",
+        timeout,
+        executable,
+        scratch_dir,
+        use_tmpfs,
     )
+    if status != "ok":
+        return None
+    point = __polar_table(np.array([target_cl], dtype=float), polar, "CL")[0]
+    if not point["converged"]:
+        METRICS.count("not_converged")
+        return None
+    return float(point["alpha"]), float(point["CL"]), float(point["CD"]), float(point["CM"])
+
 
+async def __run_xfoil_async(
+    folder: str,
+    foil_dat_file: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    operating_points: str,
+    timeout: float | str,
+    executable: str | list[str],
+    scratch_dir: str | None,
+    use_tmpfs: bool,
+    distributions: bool = False,
+) -> tuple[np.ndarray | None, str, dict | None]:
+    """
+    Coroutine version of `__run_xfoil`. The XFOIL process is killed when the coroutine is cancelled.
+    """
+    job_dir, command, data_path, profile, timeout = __open_job(
+        __foil_path(folder, foil_dat_file),
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        operating_points,
+        timeout,
+        scratch_dir,
+        use_tmpfs,
+        distributions,
+    )
     try:
-        process = subprocess.Popen(
-            ["xfoil.exe"],
-            stdout=subprocess.PIPE,
-            stdin=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+        status = "ok"
+        start = time.perf_counter()
+        with METRICS.phase("spawn"):
+            process = await asyncio.create_subprocess_exec(
+                *([executable] if isinstance(executable, str) else executable),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                cwd=job_dir,
+            )
+        try:
+            with METRICS.phase("solve"):
+                await asyncio.wait_for(process.communicate(command.encode()), timeout)
+            if process.returncode != 0:
+                status = "crash"  # unless it wrote polar rows, see `__collect_job`
+        except asyncio.TimeoutError:
+            print(f"XFoil timed out for {foil_dat_file}. Skipping.")
+            status = "timeout"
+        finally:
+            # also reached on cancellation, so no XFOIL process outlives its coroutine
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        return __finish_job(
+            data_path,
+            foil_dat_file,
+            status,
+            profile,
+            time.perf_counter() - start,
+            distributions,
         )
-        process.communicate(command, timeout=timeout)  # ⏳ Enforce timeout
-        process.wait()
+    finally:
+        __close_job(job_dir)
 
-    except subprocess.TimeoutExpired:
-        print(f"XFoil timed out for {foil_dat_file}. Skipping.")
-        process.kill()
-        return None  # Skip this perturbation
 
-    # Check if XFoil produced a valid output
-    data_path = os.path.join(os.getcwd(), folder, "Data.dat")
-    if not os.path.isfile(data_path):
-        print(f"XFoil failed to generate results for {foil_dat_file}. Skipping.")
-        return None
+async def aero_analysis_async(
+    folder: str,
+    foil_dat_file: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    alfa: float,
+    timeout: int | str = 5,
+    executable: str | list[str] = "xfoil.exe",
+    scratch_dir: str | None = None,
+    use_tmpfs: bool = False,
+    cache: XfoilCache | None = None,
+    return_distributions: bool = False,
+):
+    """
+    Coroutine version of `aero_analysis` which waits for XFOIL without blocking the event loop.
+    Cancelling the coroutine kills the XFOIL process.
+
+    PARAMETERS:
+        (same as `aero_analysis`)
+
+    RETURNS:
+        Tuple (cl, cd, cl/cd) if successful, else None, see `aero_analysis` for `return_distributions`.
+    """
+    if return_distributions:
+        cache = None  # the cache only holds coefficients
+    key, result = __cache_lookup(
+        cache,
+        folder,
+        foil_dat_file,
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        alfa,
+        executable,
+    )
+    if result is not MISSING:
+        return result
+
+    polar, status, fields = await __run_xfoil_async(
+        folder,
+        foil_dat_file,
+        cadd_adj_no,
+        angle_thresh,
+        n_pts,
+        reynolds,
+        ncrit,
+        niter,
+        f"ALFA {alfa}",
+        timeout,
+        executable,
+        scratch_dir,
+        use_tmpfs,
+        return_distributions,
+    )
+    return __analysis_result(polar, status, fields, return_distributions, cache, key)
+
+
+async def aero_analysis_batch_async(
+    foils: list[tuple[str, str]],
+    max_concurrency: int | None = None,
+    **settings,
+) -> list:
+    """
+    Runs many XFoil analyses concurrently in the running event loop, like `asyncio.gather`.
+    At most `max_concurrency` XFOIL processes run at the same time, and every job has its own timeout.
+    Cancelling the batch, or an error in one of its jobs, cancels the other jobs and waits for them to kill
+    their XFOIL processes and remove their job folders before the cancellation or error propagates.
+
+    PARAMETERS:
+        `foils` -> (folder, foil_dat_file) pairs of the aerofoils. Type(list[tuple[str, str]])
+
+        `max_concurrency` -> Number of simultaneous XFOIL processes, defaults to the number of CPUs. Type(int)
+
+        `**settings` -> Keyword arguments of `aero_analysis_async`, e.g. reynolds, alfa and the per-job timeout.
 
+    RETURNS:
+        List of (cl, cd, cl/cd) tuples or None, in the order of `foils`.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or os.cpu_count() or 1)
+
+    async def run(folder: str, foil_dat_file: str):
+        async with semaphore:
+            return await aero_analysis_async(folder, foil_dat_file, **settings)
+
+    tasks = [asyncio.ensure_future(run(folder, foil)) for folder, foil in foils]
     try:
-        with open(data_path, "r") as f:
-            lines = [line.strip() for line in f if line.strip()]
-            if lines:
-                last_line = lines[-1].split()
-                cl = float(last_line[1])
-                cd = float(last_line[2])
-                return cl, cd, cl / cd
-    except Exception as e:
-        print(f"Error reading results for {foil_dat_file}: {e}")
-        return None
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+RETRY_LADDER: tuple[dict] = (
+    {},
+    {"ramp": 2.0},
+    {"ramp": 1.0, "niter": 3},
+    {"ramp": 1.0, "niter": 3, "n_pts": 1.5},
+    {"ramp": 1.0, "niter": 3, "ncrit": 5},
+)
+"""
+Default attempts of `aero_analysis_retry`, each one a dictionary of changes to the requested settings:
+
+    `ramp` -> Step in degrees of an angle of attack ramp from 0 to alfa, warm starting every point from the previous one.
+
+    `niter` -> Factor on the number of viscous iterations.
+
+    `n_pts` -> Factor on the number of panels, repaneling the aerofoil.
+
+    `ncrit` -> Ncrit used instead of the requested one.
+
+    `timeout` -> Time budget of the attempt in seconds, instead of the `timeout` argument.
+"""
+
+
+class RetryOutcome(TypedDict):
+    """
+    Result of `aero_analysis_retry`.
+
+    `result` -> Tuple (cl, cd, cl/cd) of the first successful attempt, else None.
+
+    `reason` -> "ok", or why the last attempt failed: "timeout", "crash", "no_output", "read_error" or "not_converged".
+
+    `attempts` -> Number of attempts made.
+
+    `reasons` -> Outcome of every attempt, in order.
+    """
+
+    result: tuple[float] | None
+    reason: str
+    attempts: int
+    reasons: list[str]
 
-    return None  # If no valid data is found
+
+def __ramp(alfa: float, step: float | None) -> np.ndarray:
+    """
+    Angles of attack from 0 to alfa in steps of `step`, or just alfa without a step.
+    """
+    if not step or alfa == 0:
+        return np.array([alfa], dtype=float)
+    return np.append(np.arange(0, alfa, np.copysign(step, alfa)), alfa)
+
+
+def aero_analysis_retry(
+    folder: str,
+    foil_dat_file: str,
+    cadd_adj_no: int,
+    angle_thresh: float,
+    n_pts: int,
+    reynolds: float,
+    ncrit: int,
+    niter: int,
+    alfa: float,
+    timeout: int | str = 5,
+    executable: str | list[str] = "xfoil.exe",
+    scratch_dir: str | None = None,
+    use_tmpfs: bool = False,
+    ladder: tuple[dict] = RETRY_LADDER,
+) -> RetryOutcome:
+    """
+    Runs XFoil analysis, retrying failed or non-converged runs with progressively more robust settings
+    until one attempt succeeds or the ladder is exhausted.
+
+    PARAMETERS:
+        `ladder` -> Attempts in order, each a dictionary of setting changes, see `RETRY_LADDER`. Type(tuple[dict])
+
+        `timeout` -> Default time budget of every attempt in seconds, or "auto". Type(int | str)
+
+        (rest same as `aero_analysis`)
+
+    RETURNS:
+        `outcome` -> Result, failure reason and attempt count, see `RetryOutcome`. Type(RetryOutcome)
+    """
+    reasons = []
+    for rung in ladder:
+        alphas = __ramp(alfa, rung.get("ramp"))
+        polar, status, _ = __run_xfoil(
+            folder,
+            foil_dat_file,
+            cadd_adj_no,
+            angle_thresh,
+            int(round(n_pts * rung.get("n_pts", 1))),
+            reynolds,
+            rung.get("ncrit", ncrit),
+            int(round(niter * rung.get("niter", 1))),
+            "\n".join(f"ALFA {a}" for a in alphas),
+            rung.get("timeout", timeout),
+            executable,
+            scratch_dir,
+            use_tmpfs,
+        )
+        # only the requested angle counts, not the points of the ramp
+        point = __polar_table(alphas[-1:], polar)[0]
+        if status == "ok" and not point["converged"]:
+            METRICS.count("not_converged")
+            status = "not_converged"
+        reasons.append(status)
+        if status == "ok":
+            result = float(point["CL"]), float(point["CD"]), float(point["CL"] / point["CD"])
+            return RetryOutcome(result=result, reason="ok", attempts=len(reasons), reasons=reasons)
+
+    return RetryOutcome(
+        result=None,
+        reason=reasons[-1] if reasons else "not_converged",
+        attempts=len(reasons),
+        reasons=reasons,
+    )
@@ -0,0 +1,381 @@
+"""
+xfoil.cache
+===========
+
+Persistent SQLite cache of XFOIL analysis results.
+Entries are keyed by the rounded aerofoil surfaces and the analysis settings,
+so re-analysing a geometry that was seen before (seed aerofoils, restored shapes, line search repeats) is a lookup.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import numpy as np
+from database.control_cache import DEFAULT_CACHE_FOLDER
+from parser.parsefoil import parse_path
+
+CACHE_VERSION = 3
+"""
+Bumped whenever the analysis wrapper changes the results it produces or the keys change, invalidating older entries.
+Stores written by another version are emptied when they are opened.
+"""
+
+CACHED_STATUSES = ("ok", "not_converged")
+"""
+Outcomes of an analysis that are stored. Other failures (crashes, timeouts, unreadable output)
+may not happen again, so those analyses are run again the next time.
+"""
+
+MISSING = object()
+"""
+Returned by `XfoilCache.get` for analyses that are not cached. Cached analyses that did not converge return None.
+"""
+
+
+def executable_id(executable: str | list[str]) -> list:
+    """
+    Identifies the XFOIL build an analysis runs with: the resolved path, size and modification time
+    of the executable and of every file on its command line, e.g. the script of `fake_xfoil.FAKE_XFOIL`.
+
+    PARAMETERS:
+
+        `executable` -> XFOIL executable, or a full command line. Type(str | list[str])
+
+    RETURNS:
+
+        `identity` -> JSON serializable description of the command line. Type(list)
+    """
+    identity = []
+    for i, part in enumerate([executable] if isinstance(executable, str) else executable):
+        path = (shutil.which(part) if i == 0 else None) or part
+        if os.path.isfile(path):
+            status = os.stat(path)
+            identity.append([os.path.realpath(path), status.st_size, status.st_mtime_ns])
+        else:
+            identity.append(part)
+    return identity
+
+
+class XfoilCache:
+    """
+    Content addressed store of XFOIL results in a single SQLite file.
+    The least recently used entries are evicted once the store holds more than `max_entries` results.
+    Recency is only written back once per `touch_interval` seconds per entry, so most hits are plain reads.
+    Read-only caches can be shared by any number of worker processes, writable caches are safe to use
+    from several threads and processes as SQLite serializes the writes.
+
+    ATTRIBUTES
+
+        `path` -> Path of the SQLite file. Type(str).
+
+        `max_entries` -> Size limit of the store in results. Type(int).
+
+        `read_only` -> Whether lookups only are allowed. Type(bool).
+
+        `decimals` -> Decimals the coordinates are rounded to before hashing. Type(int).
+
+        `touch_interval` -> Seconds after which a hit marks an entry as recently used again. Type(float).
+
+        `hits` -> Number of lookups answered from the cache. Type(int).
+
+        `misses` -> Number of lookups not in the cache. Type(int).
+
+    """
+
+    def __init__(
+        self,
+        path: str = os.path.join(DEFAULT_CACHE_FOLDER, "xfoil_results.sqlite"),
+        max_entries: int = 1_000_000,
+        read_only: bool = False,
+        decimals: int = 6,
+        touch_interval: float = 600,
+    ) -> None:
+        """
+        Default constructor for XfoilCache class.
+
+        PARAMETERS:
+
+            `path` -> Path of the SQLite file, created on first use unless the cache is read-only. Type(str).
+
+            `max_entries` -> Size limit of the store in results. Type(int).
+
+            `read_only` -> Only look results up, never store or evict. A missing file behaves as an empty cache. Type(bool).
+
+            `decimals` -> Decimals the coordinates are rounded to before hashing. Type(int).
+
+            `touch_interval` -> Seconds after which a hit marks an entry as recently used again. Type(float).
+
+        RETURNS:
+
+            None
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.read_only = read_only
+        self.decimals = decimals
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        self.__count = 0  # running estimate of the number of entries, see `__evict`
+        self.__db = self.__connect()
+
+    def __connect(self) -> sqlite3.Connection | None:
+        if self.read_only:
+            try:
+                db = sqlite3.connect(
+                    f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+                )
+                if db.execute("PRAGMA user_version").fetchone()[0] == CACHE_VERSION:
+                    return db
+                db.close()
+            except sqlite3.DatabaseError:
+                pass
+            return None
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")  # readers in other processes do not block the writer
+        if db.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            db.execute("DROP TABLE IF EXISTS results")
+            db.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, cl REAL, cd REAL, status TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        db.commit()
+        self.__count = db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return db
+
+    # worker processes open their own connection to the same file
+    def __getstate__(self) -> dict:
+        return {
+            "path": self.path,
+            "max_entries": self.max_entries,
+            "read_only": self.read_only,
+            "decimals": self.decimals,
+            "touch_interval": self.touch_interval,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def __enter__(self) -> "XfoilCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def key(
+        self,
+        coords: np.ndarray,
+        cadd_adj_no: int,
+        angle_thresh: float,
+        n_pts: int,
+        reynolds: float,
+        ncrit: int,
+        niter: int,
+        alfa: float,
+        executable: str | list[str] = "xfoil.exe",
+    ) -> str:
+        """
+        Calculates the cache key of an analysis from the rounded coordinates, the analysis settings
+        and the XFOIL build, see `executable_id`.
+
+        PARAMETERS:
+
+            `coords` -> (N, 2) coordinates of the aerofoil, see `key_file` for .dat files. Type(np.ndarray).
+
+            (rest same as `aero_analysis`)
+
+        RETURNS:
+
+            `key` -> Hex digest identifying the analysis. Type(str).
+        """
+        # adding 0.0 turns -0.0 into 0.0 so both round to the same bytes
+        coords = np.ascontiguousarray(np.round(coords, self.decimals) + 0.0, dtype="<f8")
+        settings = json.dumps(
+            [
+                CACHE_VERSION,
+                int(cadd_adj_no),
+                float(angle_thresh),
+                int(n_pts),
+                float(reynolds),
+                float(ncrit),
+                int(niter),
+                float(alfa),
+                executable_id(executable),
+            ]
+        )
+        digest = hashlib.sha256(coords.tobytes())
+        digest.update(settings.encode())
+        return digest.hexdigest()
+
+    def key_file(self, dat_path: str, *settings) -> str:
+        """
+        Calculates the cache key of an analysis of an aerofoil .dat file, see `key`. The file is read with
+        `parser.parsefoil.parse_path` and keyed by its upper and lower surfaces, so the same geometry
+        in Selig or Lednicer format has the same key.
+
+        PARAMETERS:
+
+            `dat_path` -> Path of the .dat file. Type(str).
+
+            `*settings` -> cadd_adj_no, angle_thresh, n_pts, reynolds, ncrit, niter, alfa and executable.
+
+        RETURNS:
+
+            `key` -> Hex digest identifying the analysis. Type(str).
+        """
+        upper, lower = parse_path(dat_path)
+        return self.key(np.concatenate((upper, lower)), *settings)
+
+    def get(self, key: str):
+        """
+        Looks a result up and marks it as recently used, unless it was marked less than `touch_interval` seconds ago.
+
+        PARAMETERS:
+
+            `key` -> Cache key of the analysis. Type(str).
+
+        RETURNS:
+
+            Tuple (cl, cd, cl/cd), None for a cached analysis that did not converge, or `MISSING`.
+        """
+        with self.__lock:
+            row = None
+            if self.__db is not None:
+                row = self.__db.execute(
+                    "SELECT cl, cd, used FROM results WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            now = time.time()
+            if not self.read_only and now - row[2] > self.touch_interval:
+                self.__db.execute("UPDATE results SET used = ? WHERE key = ?", (now, key))
+                self.__db.commit()
+
+        cl, cd, _ = row
+        if cl is None:
+            return None
+        return cl, cd, cl / cd
+
+    def put(self, key: str, result: tuple[float] | None, status: str = "ok") -> None:
+        """
+        Stores a result and evicts old entries if the store is too large.
+        Does nothing on read-only caches or for outcomes other than `CACHED_STATUSES`.
+
+        PARAMETERS:
+
+            `key` -> Cache key of the analysis. Type(str).
+
+            `result` -> Tuple (cl, cd, cl/cd), or None for an analysis that did not converge. Type(tuple[float])
+
+            `status` -> Outcome of the analysis, "ok" or a failure reason. Type(str)
+
+        RETURNS:
+
+            None
+        """
+        if self.read_only or status not in CACHED_STATUSES:
+            return
+        if result is None:
+            cl, cd, status = None, None, "not_converged"
+        else:
+            cl, cd = result[0], result[1]
+        with self.__lock:
+            values = (cl, cd, status, time.time(), key)
+            updated = self.__db.execute(
+                "UPDATE results SET cl = ?, cd = ?, status = ?, used = ? WHERE key = ?", values
+            ).rowcount
+            if not updated:
+                self.__db.execute(
+                    "INSERT OR REPLACE INTO results (cl, cd, status, used, key) VALUES (?, ?, ?, ?, ?)",
+                    values,
+                )
+                self.__count += 1
+            self.__db.commit()
+            if self.__count > self.max_entries:
+                self.__evict()
+
+    def __evict(self) -> None:
+        # the running count misses the writes of other processes, so count exactly before evicting,
+        # then evict one percent more than needed so the next puts do not count again
+        count = self.__db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            excess += self.max_entries // 100
+            self.__db.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY used LIMIT ?)",
+                (excess,),
+            )
+            self.__db.commit()
+            count -= excess
+        self.__count = max(count, 0)
+
+    def __len__(self) -> int:
+        if self.__db is None:
+            return 0
+        return self.__db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def stats(self) -> dict:
+        """
+        Lookup statistics of this cache object.
+
+        RETURNS:
+
+            `stats` -> hits, misses, hit_rate and entries. Type(dict)
+        """
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self),
+            }
+
+    def clear(self) -> None:
+        """
+        Removes all the cached results.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        if self.read_only:
+            raise PermissionError("Cannot clear a read-only XFOIL cache")
+        with self.__lock:
+            self.__db.execute("DELETE FROM results")
+            self.__db.commit()
+            self.__count = 0
+
+    def close(self) -> None:
+        """
+        Closes the SQLite connection.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        with self.__lock:
+            if self.__db is not None:
+                self.__db.close()
+                self.__db = None
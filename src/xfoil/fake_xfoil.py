@@ -0,0 +1,329 @@
+"""
+xfoil.fake_xfoil
+================
+
+Stand-in for the XFOIL executable that speaks the same interactive command protocol over stdin.
+It is used to test and benchmark the XFOIL wrappers on machines without XFOIL installed.
+
+The aerodynamic coefficients are cheap analytic estimates from the loaded geometry, not XFOIL results.
+Aerofoils whose header name contains "HANG" freeze the solver and "CRASH" kills the process,
+to exercise the timeout and restart handling. The FAKE_XFOIL_DELAY environment variable adds a solve time
+(in seconds) to every operating point and FAKE_XFOIL_STARTUP adds a start-up time to the process.
+
+Run it with `FAKE_XFOIL` in place of the XFOIL executable, e.g. `XfoilSession(executable=FAKE_XFOIL)`.
+"""
+
+import math
+import os
+import sys
+import time
+
+FAKE_XFOIL: list[str] = [sys.executable, os.path.abspath(__file__)]
+"""
+Command line starting the fake XFOIL executable.
+"""
+
+PROMPTS = {
+    "TOP": " XFOIL   c>  ",
+    "GDES": ".GDES   c>  ",
+    "PPAR": " Change what ? (<cr> if nothing else)  c>  ",
+    "OPER": ".OPERv   c>  ",
+    "VPAR": ".VPAR   c>  ",
+}
+
+
+class FakeXfoil:
+    """
+    State of one fake XFOIL process
+    """
+
+    def __init__(self) -> None:
+        self.menu = "TOP"
+        self.name = ""
+        self.thickness = 0.0
+        self.camber = 0.0
+        self.loaded = False
+        self.viscous = False
+        self.reynolds = 0.0
+        self.ncrit = 9.0
+        self.niter = 10
+        self.n_pts = 160
+        self.polar_file = None
+        self.point = None  # last converged operating point
+        self.pending = []  # prompts waiting for a line of input
+
+    def write(self, text: str) -> None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def load(self, path: str) -> None:
+        try:
+            with open(path, "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            self.write(f"\n File OPEN error:  {path}\n")
+            return
+
+        coords = []
+        for line in lines[1:]:
+            try:
+                x, y = map(float, line.split())
+                coords.append((x, y))
+            except ValueError:
+                continue
+        if len(coords) < 3:
+            self.write("\n File READ error.  No airfoil data.\n")
+            return
+
+        self.name = lines[0].strip()
+        le = min(range(len(coords)), key=lambda i: coords[i][0])
+        upper, lower = coords[: le + 1], coords[le:]
+        # crude thickness and camber estimate from the y extremes of both surfaces
+        y_upper = max(y for _, y in upper)
+        y_lower = min(y for _, y in lower)
+        self.thickness = y_upper - y_lower
+        self.camber = (y_upper + y_lower) / 2
+        self.loaded = True
+        self.write(f"\n Plain airfoil file\n\n Number of input coordinate points: {len(coords)}\n")
+        self.write(f"\n  Max thickness = {self.thickness:.6f}\n  Max camber    = {self.camber:.6f}\n")
+
+    def open_polar(self, path: str) -> None:
+        self.polar_file = path
+        with open(path, "w") as f:
+            f.write(
+                "\n"
+                "       XFOIL         Version 6.99\n"
+                "\n"
+                f" Calculated polar for: {self.name}\n"
+                "\n"
+                " 1 1 Reynolds number fixed          Mach number fixed\n"
+                "\n"
+                " xtrf =   1.000 (top)        1.000 (bottom)\n"
+                f" Mach =   0.000     Re = {self.reynolds / 1e6:9.3f} e 6     Ncrit = {self.ncrit:7.3f}\n"
+                "\n"
+                "  alpha    CL        CD       CDp       CM     Top_Xtr  Bot_Xtr\n"
+                " ------- -------- --------- --------- -------- -------- --------\n"
+            )
+
+    def solve(self, alfa: float) -> tuple[float] | None:
+        """
+        Returns (alpha, CL, CD, CDp, CM, Top_Xtr, Bot_Xtr) or None when the point does not converge.
+        """
+        if "CRASH" in self.name.upper():
+            os._exit(1)
+        if "HANG" in self.name.upper():
+            while True:
+                time.sleep(1)
+        time.sleep(float(os.environ.get("FAKE_XFOIL_DELAY", 0)))
+
+        # stalled or under-iterated points do not converge
+        if abs(alfa) > 18 or (self.viscous and self.niter < 10):
+            self.write("\n VISCAL:  Convergence failed\n")
+            return None
+
+        alfa_rad = math.radians(alfa)
+        cl = 2 * math.pi * (alfa_rad + 2 * self.camber)
+        cd = 0.005 + 0.02 * self.thickness + 0.0002 * alfa**2
+        if self.viscous:
+            cd *= 1 + 1e5 / max(self.reynolds, 1e5) * 0.1
+        cdp = 0.4 * cd
+        cm = -math.pi * self.camber
+        top_xtr = min(max(0.6 - 0.03 * alfa, 0.01), 1.0)
+        bot_xtr = min(max(0.6 + 0.03 * alfa, 0.01), 1.0)
+        return alfa, cl, cd, cdp, cm, top_xtr, bot_xtr
+
+    def add_point(self, point: tuple[float]) -> None:
+        alfa, cl, cd, cdp, cm, top_xtr, bot_xtr = point
+        self.write(f"\n a = {alfa:7.3f}      CL = {cl:8.4f}\n Cm = {cm:8.4f}     CD = {cd:9.5f}\n")
+        if self.polar_file is not None:
+            with open(self.polar_file, "a") as f:
+                f.write(
+                    f" {alfa:7.3f} {cl:8.4f} {cd:9.5f} {cdp:9.5f} {cm:8.4f} {top_xtr:8.4f} {bot_xtr:8.4f}\n"
+                )
+            self.write(" Point added to stored polar\n")
+
+    def alfa(self, alfa: float) -> None:
+        point = self.solve(alfa)
+        self.point = point
+        if point is not None:
+            self.add_point(point)
+
+    def cl(self, cl: float) -> None:
+        # inverse of the lift curve of `solve`, rounded like the alpha XFOIL writes
+        alfa = round(math.degrees(cl / (2 * math.pi) - 2 * self.camber), 3)
+        self.alfa(alfa)
+
+    def surface(self) -> tuple[list[float]]:
+        """
+        Panel nodes from the upper trailing edge around the leading edge to the lower trailing edge,
+        with an analytic edge velocity at the last operating point.
+        """
+        alfa = self.point[0] if self.point is not None else 0.0
+        n = self.n_pts
+        xs, ys, ues = [], [], []
+        for i in range(n):
+            beta = 2 * math.pi * i / (n - 1)
+            x = (1 + math.cos(beta)) / 2
+            half = 5 * self.thickness * (
+                0.2969 * math.sqrt(x) - 0.126 * x - 0.3516 * x**2 + 0.2843 * x**3 - 0.1036 * x**4
+            )
+            upper = i < (n - 1) / 2
+            y = self.camber * 4 * x * (1 - x) + (half if upper else -half)
+            # faster flow over the suction side at positive incidence
+            ue = 1 + self.thickness + (1 if upper else -1) * math.radians(alfa) * (1 - x)
+            xs.append(x)
+            ys.append(y)
+            ues.append(ue)
+        return xs, ys, ues
+
+    def dump(self, path: str) -> None:
+        xs, ys, ues = self.surface()
+        with open(path, "w") as f:
+            f.write(
+                "#    s        x        y     Ue/Vinf    Dstar     Theta      Cf       H"
+                "       H*        P         m          K          tau         Di\n"
+            )
+            s = 0.0
+            for i, (x, y, ue) in enumerate(zip(xs, ys, ues)):
+                if i > 0:
+                    s += math.hypot(x - xs[i - 1], y - ys[i - 1])
+                theta = 1e-4 + 2e-3 * (1 - abs(2 * x - 1))
+                dstar, cf = 2.5 * theta, 0.004 * ue
+                f.write(
+                    f" {s:9.5f}{x:9.5f}{y:9.5f}{ue:9.5f}{dstar:10.6f}{theta:10.6f}{cf:10.6f}{2.5:10.3f}"
+                    f"{1.6:10.3f}{0.0:11.3e}{0.0:11.3e}{0.0:11.3e}{0.0:11.3e}{0.0:11.3e}\n"
+                )
+            # the wake rows have fewer columns
+            for i in range(1, self.n_pts // 8 + 1):
+                x = 1 + i / (self.n_pts // 8)
+                f.write(
+                    f" {s + x - 1:9.5f}{x:9.5f}{0.0:9.5f}{0.95:9.5f}{0.004:10.6f}{0.002:10.6f}{0.0:10.6f}{2.0:10.3f}\n"
+                )
+        self.write(f"\n Boundary layer data written to {path}\n")
+
+    def cpwr(self, path: str) -> None:
+        xs, ys, ues = self.surface()
+        with open(path, "w") as f:
+            f.write(f"#{self.name}\n# alpha = {self.point[0] if self.point else 0.0:8.3f}\n")
+            f.write("#    x          y          Cp  \n")
+            for x, y, ue in zip(xs, ys, ues):
+                f.write(f"{x:10.5f}{y:10.5f}{1 - ue**2:10.5f}\n")
+        self.write(f"\n Cp data written to {path}\n")
+
+    def not_recognized(self, command: str) -> None:
+        self.write(f" {command[:4]} command not recognized.  Type a \"?\" for command list\n")
+
+    def handle(self, line: str) -> bool:
+        """
+        Processes one line of input. Returns False once XFOIL quits.
+        """
+        if self.pending:
+            prompt = self.pending.pop(0)
+            value = line.strip()
+            if prompt == "RE":
+                self.reynolds = float(value)
+                self.viscous = True
+            elif prompt == "POLAR":
+                self.open_polar(value)
+                self.pending.insert(0, "DUMP")
+            return True
+
+        words = line.split()
+        if not words:  # <cr> goes back up one menu level
+            self.menu = {"VPAR": "OPER"}.get(self.menu, "TOP")
+            return True
+
+        command, args = words[0].upper(), words[1:]
+
+        if self.menu == "TOP":
+            if command == "QUIT":
+                return False
+            if command == "LOAD":
+                self.load(" ".join(args))
+            elif command in ("GDES", "PPAR", "OPER"):
+                self.menu = command
+                if args:  # e.g. "GDES CADD ..." runs CADD inside the GDES menu
+                    return self.handle(" ".join(args))
+            elif command in ("PCOP", "PANE", "NORM"):
+                pass
+            else:
+                self.not_recognized(command)
+        elif self.menu == "GDES":
+            pass  # geometry modifications are not modelled
+        elif self.menu == "PPAR":
+            if command == "N" and args:
+                self.n_pts = int(float(args[0]))
+        elif self.menu == "VPAR":
+            if command == "N" and args:
+                self.ncrit = float(args[0])
+        elif self.menu == "OPER":
+            if command == "VISC":
+                if self.viscous:
+                    self.viscous = False
+                elif args:
+                    self.reynolds = float(args[0])
+                    self.viscous = True
+                else:
+                    self.pending.append("RE")
+            elif command == "RE" and args:
+                self.reynolds = float(args[0])
+            elif command == "VPAR":
+                self.menu = "VPAR"
+            elif command == "ITER" and args:
+                self.niter = int(float(args[0]))
+            elif command == "PACC":
+                if self.polar_file is None:
+                    self.pending.append("POLAR")
+                else:
+                    self.polar_file = None
+                    self.write("\n Polar accumulation disabled\n")
+            elif command == "ALFA" and args:
+                if not self.loaded:
+                    self.write("\n ***  No airfoil available  ***\n")
+                else:
+                    self.alfa(float(args[0]))
+            elif command == "ASEQ" and len(args) >= 3:
+                start, stop, step = map(float, args[:3])
+                if not self.loaded:
+                    self.write("\n ***  No airfoil available  ***\n")
+                else:
+                    for i in range(int((stop - start) / step + 0.5) + 1):
+                        self.alfa(start + i * step)
+            elif command == "CL" and args:
+                if not self.loaded:
+                    self.write("\n ***  No airfoil available  ***\n")
+                else:
+                    self.cl(float(args[0]))
+            elif command == "CSEQ" and len(args) >= 3:
+                start, stop, step = map(float, args[:3])
+                if not self.loaded:
+                    self.write("\n ***  No airfoil available  ***\n")
+                else:
+                    for i in range(int((stop - start) / step + 0.5) + 1):
+                        self.cl(start + i * step)
+            elif command == "DUMP" and args:
+                self.dump(" ".join(args))
+            elif command == "CPWR" and args:
+                self.cpwr(" ".join(args))
+            elif command == "INIT":
+                pass
+            else:
+                self.not_recognized(command)
+        return True
+
+    def run(self) -> None:
+        time.sleep(float(os.environ.get("FAKE_XFOIL_STARTUP", 0)))
+        self.write("\n ===================================================\n")
+        self.write("  XFOIL Version 6.99 (fake)\n")
+        self.write(" ===================================================\n")
+        while True:
+            self.write("\n" + PROMPTS[self.menu])
+            line = sys.stdin.readline()
+            if not line:  # stdin closed
+                break
+            if not self.handle(line):
+                break
+
+
+if __name__ == "__main__":
+    FakeXfoil().run()
@@ -0,0 +1,237 @@
+"""
+xfoil.metrics
+=============
+
+Optional per-phase timers and counters of the XFOIL wrappers, showing where the time of an analysis goes
+(writing the job files, spawning XFOIL, solving, reading the results) and how often runs fail or hit the cache.
+"""
+
+import contextlib
+import csv
+import io
+import json
+import threading
+import time
+
+PHASES = ("write", "spawn", "solve", "read", "cleanup")
+"""
+Phases of an analysis timed by the `xfoil.analysis` wrappers: copying the aerofoil and generating the commands,
+starting the XFOIL process, waiting for it to finish, reading its output files and removing the job folder.
+"""
+
+NULL_PHASE = contextlib.nullcontext()
+"""
+Context manager returned by disabled metrics, timing nothing.
+"""
+
+
+class PhaseTimer:
+    """
+    Context manager adding the wall time of its block to one phase of an XfoilMetrics object.
+    """
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "XfoilMetrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "PhaseTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # also reached when the block raises, e.g. on timeouts
+        self.metrics.add_time(self.name, time.perf_counter() - self.start)
+
+
+class XfoilMetrics:
+    """
+    Objects of this class accumulate per-phase timers and event counters of XFOIL analyses.
+    While disabled, timing and counting do nothing, so the instrumentation can stay in place.
+
+    ATTRIBUTES
+
+        `enabled` -> Whether timers and counters are recorded. Type(bool).
+
+        `timers` -> For every phase the number of timed blocks, their total and their longest wall time in seconds. Type(dict).
+
+        `counters` -> Number of events by name, e.g. calls, timeouts, failures and cache hits. Type(dict).
+
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Default constructor for XfoilMetrics class.
+
+        PARAMETERS:
+
+            `enabled` -> Whether timers and counters are recorded. Type(bool).
+
+        RETURNS:
+
+            None
+        """
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+        self.__lock = threading.Lock()
+
+    def enable(self) -> None:
+        """
+        Starts recording timers and counters.
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stops recording timers and counters, keeping what was recorded.
+        """
+        self.enabled = False
+
+    def phase(self, name: str):
+        """
+        Times a block of code as part of a phase.
+
+        PARAMETERS:
+
+            `name` -> Name of the phase, see `PHASES`. Type(str).
+
+        RETURNS:
+
+            `timer` -> Context manager timing its block. Type(PhaseTimer)
+        """
+        if not self.enabled:
+            return NULL_PHASE
+        return PhaseTimer(self, name)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+        Adds a wall time to a phase.
+
+        PARAMETERS:
+
+            `name` -> Name of the phase. Type(str).
+
+            `seconds` -> Wall time. Type(float).
+
+        RETURNS:
+
+            None
+        """
+        with self.__lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = {"count": 0, "total": 0.0, "max": 0.0}
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """
+        Counts an event.
+
+        PARAMETERS:
+
+            `name` -> Name of the event, e.g. "calls", "timeout" or "cache_hits". Type(str).
+
+            `n` -> Number of events. Type(int).
+
+        RETURNS:
+
+            None
+        """
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> dict:
+        """
+        Snapshot of the recorded metrics.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            `summary` -> "timers" with count, total, mean and max seconds per phase, and "counters". Type(dict)
+        """
+        with self.__lock:
+            timers = {
+                name: {**timer, "mean": timer["total"] / timer["count"]}
+                for name, timer in self.timers.items()
+            }
+            return {"timers": timers, "counters": dict(self.counters)}
+
+    def to_json(self, path: str | None = None) -> str:
+        """
+        Dumps the recorded metrics as JSON.
+
+        PARAMETERS:
+
+            `path` -> File the JSON is written to, if any. Type(str).
+
+        RETURNS:
+
+            `text` -> The JSON document. Type(str)
+        """
+        text = json.dumps(self.summary(), indent=4)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_csv(self, path: str | None = None) -> str:
+        """
+        Dumps the recorded metrics as CSV with the columns kind, name, count, total, mean and max.
+        Counters only fill the count column.
+
+        PARAMETERS:
+
+            `path` -> File the CSV is written to, if any. Type(str).
+
+        RETURNS:
+
+            `text` -> The CSV document. Type(str)
+        """
+        summary = self.summary()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(("kind", "name", "count", "total", "mean", "max"))
+        for name, timer in summary["timers"].items():
+            writer.writerow(
+                ("timer", name, timer["count"], timer["total"], timer["mean"], timer["max"])
+            )
+        for name, count in summary["counters"].items():
+            writer.writerow(("counter", name, count, "", "", ""))
+
+        text = buffer.getvalue()
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def reset(self) -> None:
+        """
+        Forgets all recorded metrics.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        with self.__lock:
+            self.timers.clear()
+            self.counters.clear()
+
+
+METRICS = XfoilMetrics()
+"""
+Process wide metrics of the `xfoil.analysis` wrappers, disabled until `METRICS.enable()` is called.
+"""
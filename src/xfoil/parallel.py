@@ -0,0 +1,102 @@
+"""
+xfoil.parallel
+==============
+
+Running many independent XFOIL analyses at the same time, one process per core
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from xfoil.analysis import aero_analysis
+
+
+class ParallelXfoil:
+    """
+    Objects of this class run `aero_analysis` for many aerofoils concurrently.
+    Each analysis works in its own temporary folder, so the runs cannot overwrite each other's files.
+    The threads only wait on the XFOIL processes, which run on separate cores.
+
+    ATTRIBUTES
+
+        `max_workers` -> Number of concurrent XFOIL processes. Type(int).
+
+        `options` -> Keyword arguments passed to every `aero_analysis` call (executable, scratch_dir, use_tmpfs, timeout). Type(dict).
+
+    """
+
+    def __init__(self, max_workers: int | None = None, **options) -> None:
+        """
+        Default constructor for ParallelXfoil class.
+
+        PARAMETERS:
+
+            `max_workers` -> Number of concurrent XFOIL processes, defaults to the number of cores. Type(int).
+
+            `**options` -> Keyword arguments passed to every `aero_analysis` call,
+            e.g. executable, scratch_dir, use_tmpfs or timeout.
+
+        RETURNS:
+
+            None
+        """
+        self.max_workers = max_workers or os.cpu_count()
+        self.options = options
+        self.__executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def __enter__(self) -> "ParallelXfoil":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def submit(self, folder: str, foil_dat_file: str, **settings) -> Future:
+        """
+        Queues the analysis of one aerofoil.
+
+        PARAMETERS:
+
+            `folder` -> Folder of the aerofoil .dat file. Type(str).
+
+            `foil_dat_file` -> Name of the aerofoil .dat file. Type(str).
+
+            `**settings` -> Keyword arguments of `aero_analysis`.
+
+        RETURNS:
+
+            `future` -> Future of the (cl, cd, cl/cd) tuple or None. Type(Future).
+        """
+        return self.__executor.submit(
+            aero_analysis, folder, foil_dat_file, **{**self.options, **settings}
+        )
+
+    def map(self, foils: list[tuple[str, str]], **settings) -> list:
+        """
+        Analyses many aerofoils with the same settings. Results are in the order of `foils`,
+        whatever order the analyses finish in.
+
+        PARAMETERS:
+
+            `foils` -> (folder, foil_dat_file) of every aerofoil. Type(list[tuple[str, str]]).
+
+            `**settings` -> Keyword arguments of `aero_analysis`, e.g. cadd_adj_no, n_pts, reynolds, alfa.
+
+        RETURNS:
+
+            `results` -> (cl, cd, cl/cd) tuple or None for every aerofoil. Type(list)
+        """
+        futures = [self.submit(folder, foil, **settings) for folder, foil in foils]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """
+        Waits for the queued analyses and shuts down the worker threads.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        self.__executor.shutdown(wait=True)
@@ -0,0 +1,359 @@
+"""
+xfoil.session
+=============
+
+Long-lived XFOIL processes which analyse many aerofoils one after the other over stdin,
+so the process start-up cost is paid once per worker instead of once per analysis.
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from xfoil.analysis import read_polar, xfoil_commands
+
+SENTINEL = "ZZZZ"
+"""
+Unknown top level command sent after every job. XFOIL answers it with "ZZZZ command not recognized",
+which marks the end of the job's output on stdout.
+"""
+
+
+class XfoilSession:
+    """
+    Objects of this class keep one XFOIL process alive and stream analyses through it.
+    A worker that hangs or crashes is killed and restarted transparently for the next job.
+
+    ATTRIBUTES
+
+        `executable` -> Command line starting XFOIL. Type(list[str]).
+
+        `timeout` -> Default time limit of a job in seconds. Type(float).
+
+        `workdir` -> Private scratch folder of the session for aerofoil and polar files. Type(str).
+
+        `jobs` -> Number of jobs run so far. Type(int).
+
+        `restarts` -> Number of times the XFOIL process was (re)started. Type(int).
+
+    """
+
+    def __init__(
+        self, executable: str | list[str] = "xfoil.exe", timeout: float = 5
+    ) -> None:
+        """
+        Default constructor for XfoilSession class. The XFOIL process is started by the first job.
+
+        PARAMETERS:
+
+            `executable` -> XFOIL executable, or a full command line such as `fake_xfoil.FAKE_XFOIL`. Type(str | list[str]).
+
+            `timeout` -> Default time limit of a job in seconds. Type(float).
+
+        RETURNS:
+
+            None
+        """
+        self.executable = [executable] if isinstance(executable, str) else list(executable)
+        self.timeout = timeout
+        self.workdir = tempfile.mkdtemp(prefix="xfoil_")  # short paths, XFOIL truncates long file names
+        self.jobs = 0
+        self.restarts = 0
+        self.__process = None
+        self.__lines = None
+        self.__viscous = False  # VISC toggles viscous mode, so it is only sent once per process
+
+    def __enter__(self) -> "XfoilSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Starts a fresh XFOIL process, killing the current one if there is any.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        self.stop()
+        self.__process = subprocess.Popen(
+            self.executable,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            cwd=self.workdir,
+        )
+        self.__lines = queue.Queue()
+        # XFOIL blocks once its stdout pipe is full, so the output is drained on a separate thread
+        threading.Thread(
+            target=self.__drain, args=(self.__process.stdout, self.__lines), daemon=True
+        ).start()
+        self.__viscous = False
+        self.restarts += 1
+
+    @staticmethod
+    def __drain(stdout, lines: queue.Queue) -> None:
+        for line in iter(stdout.readline, ""):
+            lines.put(line)
+        lines.put(None)  # end of file, the process exited
+
+    def stop(self) -> None:
+        """
+        Kills the XFOIL process.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        if self.__process is not None:
+            self.__process.kill()
+            self.__process.wait()
+            self.__process = None
+
+    def close(self) -> None:
+        """
+        Kills the XFOIL process and removes the scratch folder.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        self.stop()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __commands(
+        self,
+        foil_path: str,
+        polar_path: str,
+        cadd_adj_no: int,
+        angle_thresh: float,
+        n_pts: int,
+        reynolds: float,
+        ncrit: int,
+        niter: int,
+        alfa: float,
+    ) -> str:
+        """
+        Commands of one job, see `xfoil.analysis.xfoil_commands`. They start and end at the top level menu of XFOIL:
+        polar accumulation is switched off again and the job ends with the sentinel.
+        """
+        commands = xfoil_commands(
+            foil_path,
+            polar_path,
+            "",
+            cadd_adj_no,
+            angle_thresh,
+            n_pts,
+            reynolds,
+            ncrit,
+            niter,
+            f"ALFA {alfa}",
+            visc=not self.__viscous,
+        )
+        self.__viscous = True
+        return f"{commands}PACC\n\n{SENTINEL}\n"
+
+    def run(
+        self,
+        foil_path: str,
+        cadd_adj_no: int,
+        angle_thresh: float,
+        n_pts: int,
+        reynolds: float,
+        ncrit: int,
+        niter: int,
+        alfa: float,
+        timeout: float | None = None,
+    ):
+        """
+        Runs one XFoil analysis on the session's process, same settings as `xfoil.analysis.aero_analysis`.
+        If XFoil fails, hangs or crashes the function returns None, and the process is restarted when needed.
+
+        PARAMETERS:
+
+            `foil_path` -> Path of the aerofoil .dat file. Type(str).
+
+            `timeout` -> Time limit of this job in seconds, defaults to the session timeout. Type(float).
+
+            (rest same as `aero_analysis`)
+
+        RETURNS:
+            Tuple (cl, cd, cl/cd) if successful, else None.
+        """
+        if not os.path.isfile(foil_path):
+            raise FileNotFoundError(f"Aerofoil file '{foil_path}' not found")
+        if self.__process is None or self.__process.poll() is not None:
+            self.start()
+
+        self.jobs += 1
+        job_foil = os.path.join(self.workdir, "foil.dat")
+        polar_path = os.path.join(self.workdir, f"polar_{self.jobs}.dat")
+        shutil.copyfile(foil_path, job_foil)
+
+        commands = self.__commands(
+            job_foil,
+            polar_path,
+            cadd_adj_no,
+            angle_thresh,
+            n_pts,
+            reynolds,
+            ncrit,
+            niter,
+            alfa,
+        )
+        try:
+            self.__process.stdin.write(commands)
+            self.__process.stdin.flush()
+            finished = self.__wait(self.timeout if timeout is None else timeout)
+        except (BrokenPipeError, OSError):
+            finished = False
+
+        if not finished:
+            print(f"XFoil hung or crashed for {foil_path}. Restarting worker.")
+            self.stop()
+
+        try:
+            polar = read_polar(polar_path)
+        except (OSError, ValueError):
+            return None
+        finally:
+            if os.path.isfile(polar_path):
+                os.remove(polar_path)
+
+        if not finished or len(polar) == 0:
+            return None
+        cl, cd = float(polar[-1, 1]), float(polar[-1, 2])
+        return cl, cd, cl / cd
+
+    def __wait(self, timeout: float) -> bool:
+        """
+        Reads the output of the process until the sentinel of the current job.
+        Returns False if the process timed out or exited.
+        """
+        try:
+            while True:
+                line = self.__lines.get(timeout=timeout)
+                if line is None:
+                    return False
+                if SENTINEL in line:
+                    return True
+        except queue.Empty:
+            return False
+
+
+class XfoilPool:
+    """
+    Objects of this class run analyses concurrently on a fixed number of long-lived XFOIL sessions.
+
+    ATTRIBUTES
+
+        `sessions` -> The XFOIL sessions of the pool. Type(list[XfoilSession]).
+
+    """
+
+    def __init__(
+        self,
+        n_workers: int,
+        executable: str | list[str] = "xfoil.exe",
+        timeout: float = 5,
+    ) -> None:
+        """
+        Default constructor for XfoilPool class.
+
+        PARAMETERS:
+
+            `n_workers` -> Number of XFOIL processes. Type(int).
+
+            `executable` -> XFOIL executable, or a full command line. Type(str | list[str]).
+
+            `timeout` -> Default time limit of a job in seconds. Type(float).
+
+        RETURNS:
+
+            None
+        """
+        self.sessions = [XfoilSession(executable, timeout) for _ in range(n_workers)]
+        self.__idle = queue.Queue()
+        for session in self.sessions:
+            self.__idle.put(session)
+        self.__executor = ThreadPoolExecutor(max_workers=n_workers)
+
+    def __enter__(self) -> "XfoilPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __run(self, foil_path: str, **settings):
+        session = self.__idle.get()
+        try:
+            return session.run(foil_path, **settings)
+        finally:
+            self.__idle.put(session)
+
+    def submit(self, foil_path: str, **settings) -> Future:
+        """
+        Queues one analysis on the first free session.
+
+        PARAMETERS:
+
+            `foil_path` -> Path of the aerofoil .dat file. Type(str).
+
+            `**settings` -> Keyword arguments of `XfoilSession.run`.
+
+        RETURNS:
+
+            `future` -> Future of the (cl, cd, cl/cd) tuple or None. Type(Future).
+        """
+        return self.__executor.submit(self.__run, foil_path, **settings)
+
+    def map(self, foil_paths: list[str], **settings) -> list:
+        """
+        Analyses many aerofoils with the same settings, results are in the order of `foil_paths`.
+
+        PARAMETERS:
+
+            `foil_paths` -> Paths of the aerofoil .dat files. Type(list[str]).
+
+            `**settings` -> Keyword arguments of `XfoilSession.run`.
+
+        RETURNS:
+
+            `results` -> (cl, cd, cl/cd) tuple or None for every aerofoil. Type(list)
+        """
+        futures = [self.submit(foil_path, **settings) for foil_path in foil_paths]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """
+        Waits for the queued jobs and shuts down all XFOIL processes.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        self.__executor.shutdown(wait=True)
+        for session in self.sessions:
+            session.close()
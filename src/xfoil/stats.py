@@ -0,0 +1,181 @@
+"""
+xfoil.stats
+===========
+
+Running statistics of XFOIL run times per settings profile, used to derive adaptive timeouts
+which cut hung runs short without killing slow runs that would have converged.
+"""
+
+import threading
+from collections import deque
+import numpy as np
+
+
+class RuntimeStats:
+    """
+    Objects of this class track the wall times of the latest successful XFOIL runs of every settings profile
+    and derive the timeout of the next run from them, as the `quantile` of the run times times `factor`,
+    clipped to [`floor`, `ceiling`]. Profiles with fewer than `min_samples` runs use `default`.
+
+    ATTRIBUTES
+
+        `quantile` -> Percentile of the run times the timeout is based on. Type(float).
+
+        `factor` -> Safety factor on the percentile. Type(float).
+
+        `floor` -> Smallest timeout in seconds. Type(float).
+
+        `ceiling` -> Largest timeout in seconds. Type(float).
+
+        `default` -> Timeout in seconds of profiles without enough samples. Type(float).
+
+        `min_samples` -> Number of runs of a profile before its own timeout is used. Type(int).
+
+        `window` -> Number of latest run times kept per profile. Type(int).
+
+    """
+
+    def __init__(
+        self,
+        quantile: float = 99,
+        factor: float = 3,
+        floor: float = 1,
+        ceiling: float = 30,
+        default: float = 10,
+        min_samples: int = 20,
+        window: int = 1000,
+    ) -> None:
+        """
+        Default constructor for RuntimeStats class.
+
+        PARAMETERS:
+
+            `quantile` -> Percentile of the run times the timeout is based on. Type(float).
+
+            `factor` -> Safety factor on the percentile. Type(float).
+
+            `floor` -> Smallest timeout in seconds. Type(float).
+
+            `ceiling` -> Largest timeout in seconds. Type(float).
+
+            `default` -> Timeout in seconds of profiles without enough samples. Type(float).
+
+            `min_samples` -> Number of runs of a profile before its own timeout is used. Type(int).
+
+            `window` -> Number of latest run times kept per profile. Type(int).
+
+        RETURNS:
+
+            None
+        """
+        self.quantile = quantile
+        self.factor = factor
+        self.floor = floor
+        self.ceiling = ceiling
+        self.default = default
+        self.min_samples = min_samples
+        self.window = window
+        self.__lock = threading.Lock()
+        self.__times = {}  # profile -> deque of run times of successful runs
+        self.__counts = {}  # profile -> {status: number of runs}
+
+    def record(self, profile: tuple, seconds: float, status: str) -> None:
+        """
+        Adds a finished run. Only successful runs enter the run time distribution,
+        the others are counted by status.
+
+        PARAMETERS:
+
+            `profile` -> Hashable settings the run time depends on. Type(tuple).
+
+            `seconds` -> Wall time of the run. Type(float).
+
+            `status` -> Outcome of the run, "ok" or a failure reason. Type(str).
+
+        RETURNS:
+
+            None
+        """
+        with self.__lock:
+            counts = self.__counts.setdefault(profile, {})
+            counts[status] = counts.get(status, 0) + 1
+            if status == "ok":
+                times = self.__times.get(profile)
+                if times is None:
+                    times = self.__times[profile] = deque(maxlen=self.window)
+                times.append(seconds)
+
+    def __timeout(self, times) -> float:
+        if times is None or len(times) < self.min_samples:
+            return self.default
+        limit = np.percentile(times, self.quantile) * self.factor
+        return float(min(max(limit, self.floor), self.ceiling))
+
+    def timeout(self, profile: tuple) -> float:
+        """
+        Timeout of the next run of a settings profile.
+
+        PARAMETERS:
+
+            `profile` -> Hashable settings the run time depends on. Type(tuple).
+
+        RETURNS:
+
+            `timeout` -> Time limit in seconds. Type(float).
+        """
+        with self.__lock:
+            times = self.__times.get(profile)
+            return self.__timeout(None if times is None else list(times))
+
+    def summary(self) -> dict:
+        """
+        Statistics of every profile seen so far.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            `summary` -> For every profile the run counts per status, the mean, p50, p90 and p99 run times
+            of the successful runs in the window, and the current timeout. Type(dict)
+        """
+        with self.__lock:
+            profiles = {
+                profile: (dict(counts), list(self.__times.get(profile, ())))
+                for profile, counts in self.__counts.items()
+            }
+
+        summary = {}
+        for profile, (counts, times) in profiles.items():
+            entry = {"runs": sum(counts.values()), "counts": counts}
+            if times:
+                p50, p90, p99 = np.percentile(times, (50, 90, 99))
+                entry.update(
+                    mean=float(np.mean(times)), p50=float(p50), p90=float(p90), p99=float(p99)
+                )
+            entry["timeout"] = self.__timeout(times)
+            summary[profile] = entry
+        return summary
+
+    def reset(self) -> None:
+        """
+        Forgets all recorded runs.
+
+        PARAMETERS:
+
+            None
+
+        RETURNS:
+
+            None
+        """
+        with self.__lock:
+            self.__times.clear()
+            self.__counts.clear()
+
+
+RUNTIME_STATS = RuntimeStats()
+"""
+Process wide run time statistics of the `xfoil.analysis` wrappers, used by `timeout="auto"`.
+"""